@@ -6,6 +6,38 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Database engine (see app/database.py)
+    DB_ECHO: bool = False # Logs every SQL statement, for local debugging only
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30 # Wait for a free pooled connection
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_CONNECT_TIMEOUT_SECONDS: float = 10
+    DB_COMMAND_TIMEOUT_SECONDS: Optional[float] = None
+    DB_STATEMENT_CACHE_SIZE: int = 100 # Set to 0 behind pgbouncer in transaction mode
+
+    # Read replicas: comma-separated URLs, empty means every query goes to the primary
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5 # Replicas further behind are skipped
+    REPLICA_LAG_CHECK_SECONDS: float = 5
+    REPLICA_PIN_SECONDS: float = 5 # Reads stay on the primary this long after a client's write
+
+    # Observability (see app/core/metrics.py)
+    LOG_LEVEL: str = "INFO"
+    SLOW_QUERY_THRESHOLD_MS: Optional[float] = 500 # Logged on "app.sql"; None disables the slow-query log
+    METRICS_ENABLED: bool = True # Prometheus metrics, across workers with PROMETHEUS_MULTIPROC_DIR set
+    METRICS_TOKEN: Optional[str] = None # GET /metrics needs "Authorization: Bearer <token>", 404 while unset
+    # Admin request profiling ("X-Profile: 1" header or ?profile=1), see app/core/profiling.py
+    PROFILING_ENABLED: bool = True
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_KEPT: int = 50
+    PROFILE_MAX_STATEMENTS: int = 1000
+
+    # Password hashing (see app/core/security.py)
+    BCRYPT_ROUNDS: int = 12 # Existing hashes are upgraded on the next successful login
+    PASSWORD_HASH_CONCURRENCY: int = 4
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5
     
     # Google Sheets
     GOOGLE_SHEETS_CREDENTIALS_FILE: Optional[str] = None
@@ -19,6 +51,59 @@ class Settings(BaseSettings):
     emails_from_email: Optional[str] = None
     emails_from_name: Optional[str] = None
 
+    # Response cache for anonymous blog reads
+    RESPONSE_CACHE_ENABLED: bool = True # Per worker, invalidations are NOTIFYed to the others (EVENTS_LISTEN_ENABLED)
+    RESPONSE_CACHE_TTL_SECONDS: float = 30
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    # Cache-Control max-age for anonymous blog reads (CDN), see app/core/http_cache.py
+    HTTP_PUBLIC_MAX_AGE_SECONDS: int = 10
+
+    # Authenticated user cache (resolves bearer tokens without a DB hit)
+    USER_CACHE_TTL_SECONDS: float = 60
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Likes write-behind: buffer like/unlike requests and write them as one batch
+    # every LIKE_FLUSH_INTERVAL_MS (requests are answered once their batch commits)
+    LIKE_WRITE_BEHIND_ENABLED: bool = False
+    LIKE_FLUSH_INTERVAL_MS: float = 5
+    LIKE_FLUSH_MAX_SIZE: int = 1000
+    # Hourly counter reconciliation leaves blogs whose counters changed this recently alone
+    COUNTER_RECONCILE_GRACE_SECONDS: float = 300
+
+    # Live blog events (GET /api/blogs/{id}/events), see app/core/events.py
+    EVENTS_LISTEN_ENABLED: bool = True # LISTEN/NOTIFY fan-out across workers; off means this worker's writes only
+    EVENTS_CHANNEL: str = "blog_events"
+    EVENTS_MAX_SUBSCRIBERS: int = 1000 # Per worker, further clients get 503 and keep polling
+    EVENTS_QUEUE_SIZE: int = 100 # Undelivered events per client before it is told to resync
+    EVENTS_MIN_INTERVAL_MS: float = 250 # Coalescing window between batches sent to a client
+    EVENTS_HEARTBEAT_SECONDS: float = 15
+    EVENTS_RETRY_MS: int = 3000 # Client reconnect delay
+    EVENTS_RECONNECT_SECONDS: float = 5
+
+    # Scheduled publishing: how often the publisher re-reads upcoming schedules from the DB
+    SCHEDULER_RELOAD_SECONDS: float = 60
+
+    # Background job leader election (Postgres advisory lock shared by all workers/nodes)
+    LEADER_ELECTION_ENABLED: bool = True
+    LEADER_LOCK_ID: int = 72710001
+    LEADER_HEARTBEAT_SECONDS: float = 10
+
+    # Exports: rows fetched per server-side cursor batch, bytes per streamed chunk
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+    EXPORT_DIR: str = "exports" # Background export artifacts (see /api/admin/exports)
+    EXPORT_RETENTION_HOURS: float = 72 # Finished export jobs and their files are deleted after this
+
+    # Bulk blog import: rows per COPY batch, and how many row errors are reported back
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 1000
+
+    # Admin analytics rollups: refresh interval, and how far behind the watermark
+    # each refresh re-aggregates to catch rows committed late
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: int = 300
+    ANALYTICS_ROLLUP_GRACE_SECONDS: int = 300
+    ANALYTICS_ROLLUP_LOCK_ID: int = 72710002 # Advisory lock serializing refreshes
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
 
 settings = Settings()
@@ -0,0 +1,217 @@
+import time
+from datetime import datetime
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlencode
+from app.config import settings
+from app.core.events import hub
+
+# Response cache for anonymous reads.
+#
+# Entries hold rendered JSON bytes and a set of invalidation tags:
+#   "blogs:list"  -> every cached list page
+#   "blog:<id>"   -> the detail and comment pages of that blog and every list page containing it
+# Writes in blog_service invalidate the tags they affect, so a like only drops
+# the pages that show that blog instead of flushing the whole cache.
+# invalidate() also reaches the other workers' caches through the event hub's NOTIFY
+# channel; with EVENTS_LISTEN_ENABLED off, run one worker or a shared backend.
+
+LIST_TAG = "blogs:list"
+
+def blog_tag(blog_id: int) -> str:
+    return f"blog:{blog_id}"
+
+def list_key(params: dict) -> str:
+    # Normalized so that equivalent query strings share an entry
+    items = []
+    for name, value in sorted(params.items()):
+        if value is None or value == []:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = ",".join(sorted(str(v) for v in value))
+        items.append((name, str(value)))
+    return "blogs:list:" + urlencode(items)
+
+def detail_key(blog_id: int) -> str:
+    return f"blogs:detail:{blog_id}"
+
+def comments_key(blog_id: int, params: dict) -> str:
+    return f"blogs:comments:{blog_id}:" + urlencode(sorted((k, str(v)) for k, v in params.items() if v is not None))
+
+def pack_response(body: bytes, etag: str, last_modified: Optional[datetime] = None) -> bytes:
+    # Stores the HTTP validators with the body so a cache hit can answer 304 too
+    stamp = last_modified.isoformat() if last_modified is not None else ""
+    return f"{etag}\n{stamp}\n".encode("utf-8") + body
+
+def unpack_response(value: bytes) -> Tuple[bytes, str, Optional[datetime]]:
+    etag, last_modified, body = value.split(b"\n", 2)
+    last_modified = datetime.fromisoformat(last_modified.decode("utf-8")) if last_modified else None
+    return body, etag.decode("utf-8"), last_modified
+
+
+class CacheBackend:
+    """
+    Interface for response cache backends.
+    Methods are async so an external store (e.g. Redis) can implement them without blocking.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, tags: Iterable[str] = (), ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class NullCache(CacheBackend):
+    # Used when RESPONSE_CACHE_ENABLED is off
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, tags: Iterable[str] = (), ttl: Optional[float] = None) -> None:
+        pass
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+
+class LRUCache(CacheBackend):
+    """
+    In-process LRU cache with a per-entry TTL and a bound on the number of entries.
+    Each worker process has its own copy; the TTL bounds staleness across workers.
+    Values are stored as-is, so it can also hold non-bytes values (see app.core.deps).
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 30):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Any, Tuple[float, Any, Set[str]]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    async def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    async def set(self, key: Any, value: Any, tags: Iterable[str] = (), ttl: Optional[float] = None) -> None:
+        tags = set(tags)
+        ttl = self.ttl_seconds if ttl is None else min(ttl, self.ttl_seconds)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    async def delete(self, key: Any) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key: Any):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "lru",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def _default_backend() -> CacheBackend:
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return NullCache()
+    return LRUCache(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+    )
+
+_backend: CacheBackend = _default_backend()
+
+def get_response_cache() -> CacheBackend:
+    return _backend
+
+def set_response_cache(backend: CacheBackend):
+    # Swap in an external backend at startup
+    global _backend
+    _backend = backend
+
+CACHE_INVALIDATED = "cache_invalidated"
+# More tags than this (a big scheduled batch) flush the other workers' caches instead,
+# NOTIFY payloads are limited to 8000 bytes
+MAX_BROADCAST_TAGS = 200
+
+async def invalidate(*tags: str):
+    await _backend.invalidate_tags(tags)
+    hub.broadcast(CACHE_INVALIDATED, {"tags": list(tags) if len(tags) <= MAX_BROADCAST_TAGS else None})
+
+async def _on_cache_invalidated(data: Optional[dict]):
+    if data is None or data["tags"] is None:
+        # The listener reconnected (invalidations may have been missed) or too many tags
+        await _backend.clear()
+    else:
+        await _backend.invalidate_tags(data["tags"])
+
+hub.on(CACHE_INVALIDATED, _on_cache_invalidated)
@@ -1,16 +1,101 @@
-from typing import Annotated
+import time
+from typing import Annotated, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from app.config import settings
 from app.core.security import verify_password
+from app.core.cache import LRUCache
+from app.core.events import hub
 from app.database import get_db
 from app.models.user import User, UserRole
 from app.schemas.auth import TokenData
 from sqlalchemy import select
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
+# user id -> column snapshot of the User row.
+# Lets most authenticated requests resolve the user without touching the database.
+# Entries live at most USER_CACHE_TTL_SECONDS and never past the token's exp;
+# invalidate_user() must be called whenever a cached column changes; it reaches the
+# other workers through the event hub's NOTIFY channel.
+user_cache = LRUCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
+
+_CACHED_USER_FIELDS = ("id", "username", "email", "role", "avatar_url", "created_at", "token_version")
+
+USER_INVALIDATED = "user_invalidated"
+
+async def invalidate_user(user_id: int):
+    await user_cache.delete(user_id)
+    hub.broadcast(USER_INVALIDATED, {"user_id": user_id})
+
+async def _on_user_invalidated(data: Optional[dict]):
+    if data is None:
+        # The listener reconnected, invalidations may have been missed
+        await user_cache.clear()
+    else:
+        await user_cache.delete(data["user_id"])
+
+hub.on(USER_INVALIDATED, _on_user_invalidated)
+
+def _user_from_snapshot(snapshot: dict) -> User:
+    # A fresh detached instance per request, so handlers can db.add() it and
+    # update columns without a SELECT, and requests never share one object
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+async def resolve_token_user(token: str, db: AsyncSession) -> Optional[User]:
+    """
+    Returns the user a bearer token belongs to, or None if the token is invalid,
+    expired, revoked (stale token_version) or the user no longer exists.
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+
+    user_id = payload.get("uid")
+    if user_id is None:
+        # Tokens issued before uid/ver claims existed
+        username: str = payload.get("sub")
+        if username is None:
+            return None
+        token_data = TokenData(username=username)
+        result = await db.execute(select(User).where(User.username == token_data.username))
+        user = result.scalars().first()
+        # No ver claim means version 0, so revoking tokens revokes these too
+        if user is None or user.token_version != 0:
+            return None
+        return user
+
+    token_version = payload.get("ver", 0)
+    snapshot = await user_cache.get(user_id)
+    if snapshot is not None:
+        if snapshot["token_version"] == token_version:
+            return _user_from_snapshot(snapshot)
+        if token_version < snapshot["token_version"]:
+            return None # Revoked, versions only go up
+        # Token newer than the snapshot: it predates a change made elsewhere, reload
+        await user_cache.delete(user_id)
+
+    user = await db.get(User, user_id)
+    if user is None or user.token_version != token_version:
+        return None
+
+    ttl = settings.USER_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        await user_cache.set(user_id, {field: getattr(user, field) for field in _CACHED_USER_FIELDS}, ttl=ttl)
+    return user
 
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[AsyncSession, Depends(get_db)]):
     credentials_exception = HTTPException(
@@ -18,21 +103,17 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: An
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
-        raise credentials_exception
-    
-    result = await db.execute(select(User).where(User.username == token_data.username))
-    user = result.scalars().first()
+    user = await resolve_token_user(token, db)
     if user is None:
         raise credentials_exception
     return user
 
+async def get_optional_user(token: Annotated[str | None, Depends(oauth2_scheme_optional)], db: Annotated[AsyncSession, Depends(get_db)]):
+    # Same as get_current_user but anonymous (or invalid) tokens yield None instead of 401
+    if not token:
+        return None
+    return await resolve_token_user(token, db)
+
 async def get_current_active_user(current_user: Annotated[User, Depends(get_current_user)]):
     # If we had an 'active' field we would check it here. For now just return user.
     return current_user
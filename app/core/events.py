@@ -0,0 +1,296 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from fastapi import Request
+from pydantic_core import to_json
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.config import settings
+from app.database import engine
+from app.utils.leader import NODE_ID
+
+logger = logging.getLogger(__name__)
+
+# Real-time blog events, streamed to clients by GET /api/blogs/{id}/events (SSE).
+#
+# Writes in blog_service publish into the hub, which hands the event to every local
+# subscriber of that blog and NOTIFYs the other workers/nodes on EVENTS_CHANNEL.
+# Each process LISTENs on a dedicated connection and delivers what the others sent.
+#
+# Events:
+#   snapshot         {"likes_count", "comments_count"}  sent once on connect
+#   likes            {"likes_count"}                    coalesced, only the latest is kept
+#   comment          CommentOut
+#   comment_deleted  {"id"}
+#   resync           {}  events were dropped (slow client, lost connection), refetch the blog
+#
+# The same channel carries process-wide messages between workers (broadcast/on):
+# user cache invalidations, scheduled publish times for the leader, ...
+
+# Only the latest of these matters, a burst of likes becomes one update per client
+COALESCED_EVENTS = {"likes"}
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_BYTES = 7900
+
+
+class Subscription:
+    # One connected client. Bounded: a client that can't keep up gets a resync instead of a backlog
+
+    def __init__(self, blog_id: int):
+        self.blog_id = blog_id
+        self.events: Deque[Tuple[str, dict]] = deque()
+        self.latest: Dict[str, dict] = {}
+        self.overflowed = False
+        self.ready = asyncio.Event()
+
+    def put(self, event: str, data: dict):
+        if event in COALESCED_EVENTS:
+            self.latest[event] = data
+        elif event == "resync" or len(self.events) >= settings.EVENTS_QUEUE_SIZE:
+            self.events.clear()
+            self.overflowed = True
+        elif not self.overflowed:
+            self.events.append((event, data))
+        self.ready.set()
+
+    async def get(self) -> List[Tuple[str, dict]]:
+        await self.ready.wait()
+        self.ready.clear()
+        if self.overflowed:
+            self.overflowed = False
+            self.latest.clear()
+            return [("resync", {})]
+        batch = list(self.events)
+        self.events.clear()
+        batch.extend(self.latest.items())
+        self.latest.clear()
+        return batch
+
+
+class EventHub:
+    """
+    In-process pub/sub for blog events, bridged across processes with Postgres
+    LISTEN/NOTIFY. Outgoing notifications are queued and sent in one round trip per
+    batch from the listener connection. The listener needs a session-pooled
+    connection (not a transaction-mode pgbouncer), like the leader election.
+    """
+
+    def __init__(self):
+        self.subscriptions: Dict[int, Set[Subscription]] = defaultdict(set)
+        # Pending NOTIFY payloads; coalesced events share a key so only the latest is sent
+        self._outbox: Dict[object, str] = {}
+        self._outbox_ready = asyncio.Event()
+        self._sequence = 0
+        self._conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        # kind -> handler of broadcast() messages from the other workers
+        self._handlers: Dict[str, Callable[[Optional[dict]], Optional[Awaitable[Any]]]] = {}
+        self._handler_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self.subscriptions.values())
+
+    def subscribe(self, blog_id: int) -> Subscription:
+        subscription = Subscription(blog_id)
+        self.subscriptions[blog_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subs = self.subscriptions.get(subscription.blog_id)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self.subscriptions[subscription.blog_id]
+
+    def deliver(self, blog_id: int, event: str, data: dict):
+        for subscription in self.subscriptions.get(blog_id, ()):
+            subscription.put(event, data)
+
+    def publish(self, blog_id: int, event: str, data: dict):
+        """
+        Sends an event to this blog's subscribers on every worker. Call after commit.
+        """
+        self.deliver(blog_id, event, data)
+        if self._task is None:
+            return
+        payload = to_json({"origin": NODE_ID, "blog_id": blog_id, "event": event, "data": data}).decode("utf-8")
+        if len(payload.encode("utf-8")) > MAX_NOTIFY_BYTES:
+            # Too big to NOTIFY (e.g. a long comment), the other workers' clients refetch instead
+            payload = to_json({"origin": NODE_ID, "blog_id": blog_id, "event": "resync", "data": {}}).decode("utf-8")
+        if event in COALESCED_EVENTS:
+            key = (blog_id, event)
+        else:
+            self._sequence += 1
+            key = self._sequence
+        self._outbox[key] = payload
+        self._outbox_ready.set()
+
+    def on(self, kind: str, handler: Callable[[Optional[dict]], Optional[Awaitable[Any]]]):
+        """
+        Registers the handler of broadcast(kind, ...) messages sent by other workers.
+        It is called with None after the listener reconnects: messages may have been missed.
+        """
+        self._handlers[kind] = handler
+
+    def broadcast(self, kind: str, data: dict):
+        """
+        Sends a message to the other workers' handler for kind; the caller handles it locally
+        itself. Best effort: without the listener (EVENTS_LISTEN_ENABLED off) nothing is sent.
+        """
+        if self._task is None:
+            return
+        self._sequence += 1
+        self._outbox[self._sequence] = to_json({"origin": NODE_ID, "kind": kind, "data": data}).decode("utf-8")
+        self._outbox_ready.set()
+
+    def _dispatch(self, kind: str, data: Optional[dict]):
+        handler = self._handlers.get(kind)
+        if handler is None:
+            return
+        try:
+            result = handler(data)
+        except Exception:
+            logger.exception("Handler for %s messages failed", kind)
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.ensure_future(result)
+            self._handler_tasks.add(task)
+            task.add_done_callback(self._handler_done)
+
+    def _handler_done(self, task: asyncio.Task):
+        self._handler_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Handler for a broadcast message failed", exc_info=task.exception())
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == NODE_ID:
+            return # Already delivered locally by publish
+        if "kind" in message:
+            self._dispatch(message["kind"], message.get("data"))
+        else:
+            self.deliver(message["blog_id"], message["event"], message["data"])
+
+    def _resync_all(self):
+        for blog_id in list(self.subscriptions):
+            self.deliver(blog_id, "resync", {})
+        for kind in list(self._handlers):
+            self._dispatch(kind, None)
+
+    async def _connect(self):
+        conn = await engine.connect()
+        try:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.add_listener(settings.EVENTS_CHANNEL, self._on_notify)
+            await conn.commit()
+        except Exception:
+            await conn.invalidate()
+            raise
+        self._conn = conn
+        self.connected = True
+
+    async def _disconnect(self):
+        conn, self._conn = self._conn, None
+        self.connected = False
+        if conn is None:
+            return
+        try:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.remove_listener(settings.EVENTS_CHANNEL, self._on_notify)
+            await conn.close()
+        except Exception:
+            await conn.invalidate()
+
+    async def _send(self):
+        payloads = list(self._outbox.values())
+        self._outbox = {}
+        if payloads:
+            await self._conn.execute(
+                text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                {"channel": settings.EVENTS_CHANNEL, "payloads": payloads}
+            )
+        else:
+            # Idle: make sure the listener connection is still alive
+            await self._conn.execute(text("SELECT 1"))
+        await self._conn.commit()
+
+    async def run(self):
+        first = True
+        while True:
+            try:
+                await self._connect()
+                if not first:
+                    # Notifications sent while we were disconnected are gone
+                    self._resync_all()
+                first = False
+                while True:
+                    try:
+                        await asyncio.wait_for(self._outbox_ready.wait(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._outbox_ready.clear()
+                    await self._send()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Blog event listener on %s lost its connection: %s", NODE_ID, e)
+                await self._disconnect()
+                await asyncio.sleep(settings.EVENTS_RECONNECT_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._disconnect()
+        self._outbox = {}
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.connected,
+            "subscribers": self.subscriber_count,
+            "blogs": len(self.subscriptions),
+            "pending_notifications": len(self._outbox),
+        }
+
+hub = EventHub()
+
+
+def format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {to_json(data).decode('utf-8')}\n\n"
+
+async def stream(request: Request, blog_id: int, snapshot: dict) -> AsyncIterator[str]:
+    """
+    Server-Sent Events body for one client: the snapshot, then events as they come,
+    at most one batch per EVENTS_MIN_INTERVAL_MS, with a keepalive comment when idle.
+    """
+    subscription = hub.subscribe(blog_id)
+    try:
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n" + format_event("snapshot", snapshot)
+        while True:
+            try:
+                batch = await asyncio.wait_for(subscription.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            yield "".join(format_event(event, data) for event, data in batch)
+            # Lets bursts (many likes at once) pile up into the next batch
+            await asyncio.sleep(settings.EVENTS_MIN_INTERVAL_MS / 1000)
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,78 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+from fastapi import Request, Response
+from app.config import settings
+
+# HTTP validators (ETag / Last-Modified) for blog reads.
+#
+# Validators come from the row version (updated_at, counters_updated_at and the
+# counters) rather than from the rendered body, so a revalidation can be answered
+# with 304 right after the blog row is read: before engagement, comments or
+# serialization. Responses differ per viewer (is_liked), so the viewer is part of
+# the ETag and responses carry Vary: Authorization.
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+def _viewer(user) -> str:
+    return f"user:{user.id}" if user is not None else "anonymous"
+
+def blog_version(blog) -> tuple:
+    return (blog.id, blog.updated_at, blog.counters_updated_at, blog.likes_count, blog.comments_count)
+
+def blog_last_modified(blog) -> datetime:
+    candidates = [value for value in (blog.updated_at, blog.counters_updated_at) if value is not None]
+    return max(candidates)
+
+def detail_validators(blog, user=None) -> Tuple[str, datetime]:
+    return make_etag("detail", _viewer(user), blog_version(blog)), blog_last_modified(blog)
+
+def list_etag(blogs: Iterable, user=None, *extra) -> str:
+    # Any change to a row on the page (edit, like, comment), to the set of rows or
+    # to the totals/cursor gives a new ETag
+    return make_etag("list", _viewer(user), extra, [blog_version(blog) for blog in blogs])
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None, public: bool = True) -> dict:
+    headers = {"ETag": etag, "Vary": "Authorization"}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    if public:
+        # Shared caches (CDN) may reuse it briefly, then must revalidate
+        headers["Cache-Control"] = f"public, max-age={settings.HTTP_PUBLIC_MAX_AGE_SECONDS}, must-revalidate"
+    else:
+        # Only the client's own cache, revalidated every time
+        headers["Cache-Control"] = "private, no-cache"
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: W/"x" matches "x"
+        wanted = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
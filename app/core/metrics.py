@@ -0,0 +1,149 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+# Prometheus metrics, rendered at GET /metrics in the text exposition format.
+#
+# Per request (MetricsMiddleware): latency by route, requests in flight, and the
+# number of SQL statements and total database time, counted by engine events.
+# Also: every statement's duration, pool checkout time, background job durations,
+# and a slow-query log (SLOW_QUERY_THRESHOLD_MS) on the "app.sql" logger.
+#
+# With several workers (gunicorn -w N) set PROMETHEUS_MULTIPROC_DIR to an empty
+# directory shared by them, before they start: each worker writes its values there
+# and /metrics adds up all of them, whichever worker answers the scrape.
+# gunicorn.conf.py clears it on start and cleans up after dead workers.
+
+slow_query_logger = logging.getLogger("app.sql")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+JOB_BUCKETS = (0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+
+
+def render() -> bytes:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Reads every worker's files, a fresh registry per scrape as prometheus_client requires
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, by route template.", ("method", "route", "status"),
+    buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being handled right now.", ("method",), multiprocess_mode="livesum"
+)
+HTTP_REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements executed per request.", ("method", "route"), buckets=COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request.", ("method", "route"), buckets=LATENCY_BUCKETS
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds", "Duration of every SQL statement.", ("engine",), buckets=LATENCY_BUCKETS
+)
+DB_SLOW_STATEMENTS = Counter("db_slow_statements_total", "Statements slower than SLOW_QUERY_THRESHOLD_MS.", ("engine",))
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds", "Time to get a pooled connection, including waiting for a free one.", ("engine",),
+    buckets=LATENCY_BUCKETS
+)
+JOB_DURATION = Histogram("background_job_duration_seconds", "Background job run time.", ("job", "status"), buckets=JOB_BUCKETS)
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "queries")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        # (statement, seconds) of each query, only while the request is profiled
+        self.queries: Optional[list] = None
+
+# Set for the duration of each request; SQLAlchemy's greenlets run with the caller's context
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine: Engine, name: str):
+    """
+    Times every statement on the engine (pass engine.sync_engine for async engines),
+    adds it to the current request's stats and logs the slow ones.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+        DB_STATEMENT_DURATION.labels(engine=name).observe(elapsed)
+        stats = request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+            if stats.queries is not None and len(stats.queries) < settings.PROFILE_MAX_STATEMENTS:
+                stats.queries.append((statement, elapsed))
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold is not None and elapsed * 1000 >= threshold:
+            DB_SLOW_STATEMENTS.labels(engine=name).inc()
+            # Statement text only, parameters may hold user data
+            slow_query_logger.warning("Slow query on %s (%.0fms): %s", name, elapsed * 1000, " ".join(statement.split())[:2000])
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("statement_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def _route_label(scope) -> str:
+    # The route template, never the raw path, to keep label cardinality bounded.
+    # FastAPI keeps the router's own route in scope["route"], the prefixed one is here
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: doesn't buffer or wrap streaming responses
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        HTTP_REQUESTS_IN_PROGRESS.labels(method=method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.labels(method=method).dec()
+            request_stats.reset(token)
+            route = _route_label(scope)
+            HTTP_REQUEST_DURATION.labels(method=method, route=route, status=status_code).observe(elapsed)
+            HTTP_REQUEST_DB_STATEMENTS.labels(method=method, route=route).observe(stats.statements)
+            HTTP_REQUEST_DB_SECONDS.labels(method=method, route=route).observe(stats.db_seconds)
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+import uuid
+from cProfile import Profile
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import parse_qsl
+from fastapi.responses import JSONResponse
+from app.core import metrics
+from app.core.deps import resolve_token_user
+from app.database import AsyncSessionLocal
+from app.models.user import UserRole
+from app.services import profile_service
+
+logger = logging.getLogger(__name__)
+
+# On-demand profiling of a single request, for admins.
+#
+# Send the request with an "X-Profile: 1" header or a "profile=1" query parameter
+# and an admin bearer token. It runs under cProfile with its SQL statements
+# recorded, the response carries an X-Profile-Id header, and the profile can be
+# read from GET /api/admin/profiles/{id} once the request has finished.
+# For anyone else the flag is ignored and the request is served as usual.
+#
+# cProfile sees the whole event loop thread, so other requests this worker handles
+# meanwhile show up in the function stats too (the SQL list is this request's only).
+# One profile runs at a time per worker. Event streams (SSE) stay open for as long as
+# the client wants, so those are only profiled up to the start of the response.
+# Requests without the flag only pay for the flag check; with PROFILING_ENABLED off
+# the middleware isn't installed at all.
+
+PROFILE_HEADER = b"x-profile"
+STREAMING_CONTENT_TYPE = b"text/event-stream"
+
+_profile_lock = asyncio.Lock()
+
+def _requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value not in (b"", b"0", b"false")
+    query = scope["query_string"]
+    if b"profile=" in query:
+        return dict(parse_qsl(query.decode("latin-1"))).get("profile") not in (None, "", "0", "false")
+    return False
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token
+    return None
+
+async def _admin_username(scope) -> Optional[str]:
+    # Same token checks as the admin endpoints, None unless the caller is an admin
+    token = _bearer_token(scope)
+    if not token:
+        return None
+    async with AsyncSessionLocal() as db:
+        user = await resolve_token_user(token, db)
+    if user is None or user.role != UserRole.admin:
+        return None
+    return user.username
+
+def _is_stream(headers) -> bool:
+    return any(name == b"content-type" and value.startswith(STREAMING_CONTENT_TYPE) for name, value in headers)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        username = await _admin_username(scope)
+        if username is None:
+            await self.app(scope, receive, send)
+            return
+        if _profile_lock.locked():
+            response = JSONResponse({"detail": "Another request is being profiled, retry shortly"}, status_code=409)
+            await response(scope, receive, send)
+            return
+
+        await _profile_lock.acquire()
+        await self._profile(scope, receive, send, username)
+
+    async def _profile(self, scope, receive, send, username: str):
+        # Holds _profile_lock on entry, finish() releases it
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+        finished = False
+
+        # Reuse the request's metrics stats (or start our own) to collect its SQL
+        stats = metrics.request_stats.get()
+        token = None
+        if stats is None:
+            stats = metrics.RequestStats()
+            token = metrics.request_stats.set(stats)
+        stats.queries = []
+
+        async def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            profiler.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+            statements, stats.queries = stats.queries, None
+            _profile_lock.release()
+
+            profile = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query_string": scope["query_string"].decode("latin-1"),
+                "status_code": status_code,
+                "duration_ms": duration_ms,
+                "created_by": username,
+                "created_at": created_at.isoformat(),
+            }
+            try:
+                await asyncio.to_thread(profile_service.save_profile, profile, profiler, statements)
+            except Exception:
+                logger.exception("Could not save profile %s", profile_id)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = message.get("headers", [])
+                message = {**message, "headers": [*headers, (b"x-profile-id", profile_id.encode())]}
+                if _is_stream(headers):
+                    # Stop here rather than hold the lock for the whole stream
+                    await finish()
+            await send(message)
+
+        created_at = datetime.now(timezone.utc)
+        profiler = Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await finish()
+            if token is not None:
+                metrics.request_stats.reset(token)
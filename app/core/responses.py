@@ -0,0 +1,18 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+# Routes with a response_model already take FastAPI's fast path: the return value
+# is validated into the model and dumped straight to JSON bytes by pydantic-core.
+# Setting a custom default_response_class on the app would turn that path off
+# (FastAPI then builds a dict first and hands it to the response class), so the
+# app default stays as it is and this class is opt-in.
+#
+# Use it for routes without a response_model that return plain dicts/lists,
+# returning FastJSONResponse(payload) directly: FastAPI then skips its
+# jsonable_encoder pass and pydantic-core encodes the payload (datetimes, enums,
+# nested models) in one go. See bench_serialization.py for numbers.
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Union
 from jose import jwt
@@ -8,11 +10,65 @@ import bcrypt
 
 # pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is CPU bound (~250ms at cost 12) and releases the GIL, so the async
+# helpers below run it on a dedicated thread pool instead of the event loop.
+# At most PASSWORD_HASH_CONCURRENCY hashes run at once; callers wait up to
+# PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS for a slot before PasswordHashingBusy is raised.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_CONCURRENCY,
+    thread_name_prefix="bcrypt"
+)
+_hash_slots: Union[asyncio.Semaphore, None] = None
+
+class PasswordHashingBusy(Exception):
+    """Raised when no hashing slot frees up within the queue timeout."""
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8')
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    # Hash format: $2b$<cost>$<salt+hash>
+    try:
+        cost = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return cost != settings.BCRYPT_ROUNDS
+
+async def _run_hashing(fn, *args):
+    global _hash_slots
+    if _hash_slots is None:
+        _hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
+    try:
+        await asyncio.wait_for(_hash_slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise PasswordHashingBusy()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_slots.release()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
+
+def shutdown_hashing():
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
+def user_token_claims(user) -> dict:
+    # sub stays the username for older clients; uid/ver let deps resolve the user by id
+    # from the user cache and reject tokens issued before the last token_version bump
+    return {
+        "sub": user.username,
+        "uid": user.id,
+        "role": user.role.value if hasattr(user.role, "value") else user.role,
+        "ver": user.token_version or 0,
+    }
 
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None) -> str:
     to_encode = data.copy()
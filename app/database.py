@@ -1,42 +1,201 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import asyncio
+import itertools
+import logging
+import time
+from typing import List, Optional
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.dml import UpdateBase
 from app.config import settings
+from app.core import metrics
 
-# Handle Neon/Render postgres:// protocol
-db_url = settings.DATABASE_URL
-if db_url and db_url.startswith("postgres://"):
-    db_url = db_url.replace("postgres://", "postgresql+asyncpg://", 1)
-elif db_url and db_url.startswith("postgresql://"):
-    db_url = db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-
-connect_args = {}
-
-# Check for sslmode or ssl in URL and handle it manually for asyncpg
-if db_url and "?" in db_url:
-    base_url, query = db_url.split("?", 1)
-    
-    # Strip params that asyncpg complains about
-    # Typical params: sslmode=require, ssl=require, ssl=true
-    if "sslmode=" in query or "ssl=" in query:
-        db_url = base_url
+logger = logging.getLogger(__name__)
+
+def _engine_url(url: str):
+    # Handle Neon/Render postgres:// protocol
+    db_url = url
+    if db_url and db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql+asyncpg://", 1)
+    elif db_url and db_url.startswith("postgresql://"):
+        db_url = db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    connect_args = {}
+
+    # Check for sslmode or ssl in URL and handle it manually for asyncpg
+    if db_url and "?" in db_url:
+        base_url, query = db_url.split("?", 1)
+
+        # Strip params that asyncpg complains about
+        # Typical params: sslmode=require, ssl=require, ssl=true
+        if "sslmode=" in query or "ssl=" in query:
+            db_url = base_url
+            connect_args["ssl"] = "require"
+
+    # Force SSL for known cloud providers if not already set
+    if "neon.tech" in db_url or "aws.com" in db_url:
         connect_args["ssl"] = "require"
 
-# Force SSL for known cloud providers if not already set
-if "neon.tech" in db_url or "aws.com" in db_url:
-    connect_args["ssl"] = "require"
+    return db_url, connect_args
 
-engine = create_async_engine(
-    db_url, 
-    echo=True,
-    connect_args=connect_args,
-    pool_pre_ping=True
-)
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # Records how long each checkout takes, waiting for a free connection included
+    metrics_name = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_CHECKOUT.labels(engine=self.metrics_name).observe(time.perf_counter() - start)
+
+def _create_engine(url: str, name: str = "primary") -> AsyncEngine:
+    db_url, connect_args = _engine_url(url)
+    connect_args["timeout"] = settings.DB_CONNECT_TIMEOUT_SECONDS
+    connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    if settings.DB_COMMAND_TIMEOUT_SECONDS is not None:
+        connect_args["command_timeout"] = settings.DB_COMMAND_TIMEOUT_SECONDS
+    if settings.DB_STATEMENT_CACHE_SIZE == 0:
+        # SQLAlchemy keeps its own prepared statement cache on top of asyncpg's
+        separator = "&" if "?" in db_url else "?"
+        db_url += f"{separator}prepared_statement_cache_size=0"
+
+    new_engine = create_async_engine(
+        db_url,
+        echo=settings.DB_ECHO,
+        connect_args=connect_args,
+        poolclass=type("TimedQueuePool", (TimedQueuePool,), {"metrics_name": name}),
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS
+    )
+    metrics.instrument_engine(new_engine.sync_engine, name)
+    return new_engine
+
+engine = _create_engine(settings.DATABASE_URL)
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        # Unhealthy until the first lag check passes
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+
+
+class ReplicaSet:
+    """
+    Read replicas plus a background task that measures their replication lag.
+    Replicas that are unreachable or more than REPLICA_MAX_LAG_SECONDS behind
+    are skipped; with none left reads fall back to the primary.
+    """
+
+    # 0 when the replica has replayed everything it received, so an idle primary
+    # doesn't make the replica look like it is falling behind
+    LAG_QUERY = text("""
+        SELECT CASE
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+    """)
 
-AsyncSessionLocal = async_sessionmaker(autoflush=False, class_=AsyncSession, expire_on_commit=False, bind=engine)
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(_create_engine(url, f"replica{i}")) for i, url in enumerate(urls)]
+        self._next = itertools.cycle(self.replicas) if self.replicas else None
+        self._task: Optional[asyncio.Task] = None
+
+    def pick(self) -> Optional[AsyncEngine]:
+        # Round robin over healthy replicas
+        for _ in range(len(self.replicas)):
+            replica = next(self._next)
+            if replica.healthy:
+                return replica.engine
+        return None
+
+    async def check(self):
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    lag = await asyncio.wait_for(conn.scalar(self.LAG_QUERY), timeout=settings.REPLICA_LAG_CHECK_SECONDS)
+                replica.lag_seconds = float(lag)
+                replica.healthy = replica.lag_seconds <= settings.REPLICA_MAX_LAG_SECONDS
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning("Read replica %s unavailable: %s", replica.engine.url.host, e)
+                replica.healthy = False
+                replica.lag_seconds = None
+
+    async def run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.REPLICA_LAG_CHECK_SECONDS)
+
+    def start(self):
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> list:
+        return [
+            {"host": replica.engine.url.host, "healthy": replica.healthy, "lag_seconds": replica.lag_seconds}
+            for replica in self.replicas
+        ]
+
+replicas = ReplicaSet([url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()])
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to a replica when the session was opened with info={"use_replica": True}.
+    Flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE and raw SQL always go to the
+    primary, and once a session has written everything after it does too.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase) or getattr(clause, "_for_update_arg", None) is not None:
+            self.info["wrote"] = True
+        elif (
+            self.info.get("use_replica")
+            and not self.info.get("wrote")
+            and getattr(clause, "is_select", False)
+        ):
+            replica = replicas.pick()
+            if replica is not None:
+                return replica.sync_engine
+        return engine.sync_engine
+
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False, class_=AsyncSession, expire_on_commit=False, bind=engine, sync_session_class=RoutingSession
+)
 
 class Base(DeclarativeBase):
     pass
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
+# Set on responses to writes so the same client reads its own writes from the primary
+PIN_COOKIE = "db_pin_primary"
+READ_METHODS = ("GET", "HEAD")
+
+async def get_db(request: Request, response: Response):
+    use_replica = False
+    if replicas.replicas:
+        if request.method in READ_METHODS:
+            use_replica = PIN_COOKIE not in request.cookies
+        else:
+            response.set_cookie(PIN_COOKIE, "1", max_age=max(1, int(settings.REPLICA_PIN_SECONDS)), httponly=True)
+
+    async with AsyncSessionLocal(info={"use_replica": use_replica}) as session:
         yield session
@@ -1,21 +1,52 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import secrets
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST
 from contextlib import asynccontextmanager
 from app.config import settings
-from app.routers import auth, users, blogs, comments, admin
-from app.utils.scheduler import start_scheduler
+from app.routers import auth, users, blogs, comments, admin, tags
+from app.utils.scheduler import start_scheduler, stop_scheduler
+from app.core.security import shutdown_hashing
+from app.database import engine, replicas
+from app.services import export_service
+from app.services.blog_service import like_buffer
+from app.core.events import hub as event_hub
+from app.core import metrics
+from app.core.profiling import ProfilingMiddleware
+
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    replicas.start()
+    if settings.LIKE_WRITE_BEHIND_ENABLED:
+        like_buffer.start()
+    if settings.EVENTS_LISTEN_ENABLED:
+        event_hub.start()
     start_scheduler()
+    # Jobs left queued/running by a previous run of this node's workers
+    await asyncio.to_thread(export_service.cleanup_jobs)
     yield
     # Shutdown
+    await stop_scheduler()
+    shutdown_hashing()
+    await like_buffer.stop()
+    await event_hub.stop()
+    await replicas.stop()
+    await engine.dispose()
 
 app = FastAPI(title="Blog Application Backend", lifespan=lifespan)
 
 from fastapi.middleware.cors import CORSMiddleware
 
 
+if settings.PROFILING_ENABLED:
+    # Added first so CORS wraps it: its 409 and the X-Profile-Id header get CORS headers too
+    app.add_middleware(ProfilingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -24,12 +55,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    # Outermost, so the timings include the other middleware
+    app.add_middleware(metrics.MetricsMiddleware)
+
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(blogs.router, prefix="/api")
 app.include_router(comments.router, prefix="/api")
 app.include_router(admin.router, prefix="/api")
+app.include_router(tags.router, prefix="/api")
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Blog Application Backend"}
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics(request: Request):
+    # Only served with a METRICS_TOKEN set, the scraper sends it as a bearer token
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(request.headers.get("authorization", ""), f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    # Sync on purpose: in multiprocess mode rendering reads every worker's files
+    return Response(metrics.render(), media_type=CONTENT_TYPE_LATEST)
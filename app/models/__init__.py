@@ -2,3 +2,6 @@ from app.models.user import User
 from app.models.blog import Blog
 from app.models.comment import Comment
 from app.models.like import Like
+from app.models.tag import TagStat
+from app.models.job import BackgroundJob
+from app.models.analytics import AnalyticsHourly, RollupWatermark
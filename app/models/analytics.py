@@ -0,0 +1,26 @@
+from sqlalchemy import Integer, String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+from datetime import datetime
+
+class AnalyticsHourly(Base):
+    # One row per UTC hour with the activity created in that hour.
+    # Rebuilt incrementally by app/services/analytics_service.py, never written on the request path.
+    # Blog status columns count the blogs created in that hour by their current status.
+    __tablename__ = "analytics_hourly"
+
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    new_users: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    new_blogs: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    published_blogs: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    draft_blogs: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    scheduled_blogs: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    new_comments: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    new_likes: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+class RollupWatermark(Base):
+    # High-watermark of each rollup: everything before it is already aggregated
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
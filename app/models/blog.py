@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, func
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.database import Base
 import enum
@@ -22,11 +22,35 @@ class Blog(Base):
     tags: Mapped[List[str]] = mapped_column(ARRAY(String), default=[])
     status: Mapped[BlogStatus] = mapped_column(Enum(BlogStatus), default=BlogStatus.draft)
     scheduled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     updated_by: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Denormalized engagement counters, maintained on write by blog_service
+    # and repaired in bulk by the reconciliation job in app/utils/scheduler.py
+    likes_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    comments_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Last change of the counters (they don't touch updated_at), for Last-Modified
+    counters_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Derived from content on write (blog_service.summarize_content) so list
+    # cards can skip loading the content column
+    excerpt: Mapped[str | None] = mapped_column(Text, nullable=True)
+    reading_time: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1") # minutes
+    # Weighted full-text document over title/tags/description/content.
+    # Maintained by the blogs_search_vector_update trigger, never written from Python.
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
 
     author = relationship("User", back_populates="blogs")
-    comments = relationship("Comment", back_populates="blog", cascade="all, delete-orphan")
-    likes = relationship("Like", back_populates="blog", cascade="all, delete-orphan")
+    # passive_deletes: the FKs cascade in the database, so deleting a blog
+    # doesn't load every comment and like first
+    comments = relationship("Comment", back_populates="blog", cascade="all, delete-orphan", passive_deletes=True)
+    likes = relationship("Like", back_populates="blog", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_blogs_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_blogs_tags", "tags", postgresql_using="gin"),
+        # Blog list: status filter + (created_at, id) order/keyset, scanned backwards for newest first
+        Index("ix_blogs_status_created_at_id", "status", "created_at", "id"),
+        # Scheduled publisher: only the (few) scheduled rows are indexed
+        Index("ix_blogs_scheduled_at_scheduled", "scheduled_at", postgresql_where=text("status = 'scheduled'")),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.database import Base
 from datetime import datetime
@@ -10,7 +10,12 @@ class Comment(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     blog_id: Mapped[int] = mapped_column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"))
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     blog = relationship("Blog", back_populates="comments")
     user = relationship("User", back_populates="comments")
+
+    __table_args__ = (
+        # Comment threads are paginated per blog by (created_at, id)
+        Index("ix_comments_blog_id_created_at_id", "blog_id", "created_at", "id"),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Integer, String, Text, Float, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+from datetime import datetime
+
+class BackgroundJob(Base):
+    # Last-run summary per background job, written by the leader after every run
+    # so any worker can report job health (see app/utils/jobs.py)
+    __tablename__ = "background_jobs"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    node_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    last_started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_duration_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    last_lag_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    max_lag_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    runs: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    failures: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
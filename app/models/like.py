@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.database import Base
+from datetime import datetime
 
 class Like(Base):
     __tablename__ = "likes"
@@ -8,8 +9,13 @@ class Like(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     blog_id: Mapped[int] = mapped_column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"))
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     blog = relationship("Blog", back_populates="likes")
     user = relationship("User", back_populates="likes")
 
-    __table_args__ = (UniqueConstraint('blog_id', 'user_id', name='unique_blog_user_like'),)
+    __table_args__ = (
+        UniqueConstraint('blog_id', 'user_id', name='unique_blog_user_like'),
+        # is_liked lookups: one user, many blogs
+        Index('ix_likes_user_id_blog_id', 'user_id', 'blog_id'),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class TagStat(Base):
+    # Per-tag count of published blogs.
+    # Maintained incrementally by blog_service on every write that changes
+    # a published blog's tags or status, so the facet endpoint never scans blogs.
+    __tablename__ = "tag_stats"
+
+    tag: Mapped[str] = mapped_column(String, primary_key=True)
+    published_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
@@ -17,7 +17,9 @@ class User(Base):
     password_hash: Mapped[str] = mapped_column(String)
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), default=UserRole.user)
     avatar_url: Mapped[str | None] = mapped_column(String, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Bumped to revoke every outstanding token of the user (e.g. on role change)
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     blogs = relationship("Blog", back_populates="author", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="user")
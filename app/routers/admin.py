@@ -1,51 +1,202 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from typing import Annotated, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
+from app.database import get_db, engine, replicas
 from app.models.user import User
-from app.core.deps import get_current_admin_user
-from app.services import blog_service
-import csv
-import io
+from app.models.blog import BlogStatus
+from app.schemas.auth import UserOut, UserRoleUpdate
+from app.schemas.export import ExportJobCreate, ExportJobOut
+from app.schemas.profile import ProfileOut, ProfileDetail
+from app.schemas.blog import BlogImportResult
+from app.core.deps import get_current_admin_user, invalidate_user
+from app.services import auth_service, export_service, analytics_service, import_service, profile_service
+from app.core.cache import get_response_cache
+from app.core import events
+from app.core.responses import FastJSONResponse
+from app.models.job import BackgroundJob
+from app.utils.leader import NODE_ID
+from app.utils.scheduler import leader
+from sqlalchemy import select
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.get("/analytics")
 async def get_analytics(
+    current_user: Annotated[User, Depends(get_current_admin_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    granularity: Annotated[str, Query(pattern="^(hour|day)$")] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    # Served from the hourly rollups, fresh up to "as_of" (see analytics_service)
+    analytics = await analytics_service.get_analytics(db, granularity=granularity, start=start, end=end)
+    return FastJSONResponse(analytics)
+
+@router.put("/users/{id}/role", response_model=UserOut)
+async def update_user_role(
+    id: int,
+    role_update: UserRoleUpdate,
     current_user: Annotated[User, Depends(get_current_admin_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    return await blog_service.get_metrics(db)
+    user = await db.get(User, id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user = await auth_service.set_user_role(db, user, role_update.role)
+    await invalidate_user(user.id)
+    return user
+
+@router.get("/jobs")
+async def get_jobs(
+    current_user: Annotated[User, Depends(get_current_admin_user)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    # Last run duration and lag of each background job, as recorded by the leader
+    result = await db.execute(select(BackgroundJob).order_by(BackgroundJob.name))
+    jobs = [
+        {
+            "name": job.name,
+            "node_id": job.node_id,
+            "last_started_at": job.last_started_at,
+            "last_finished_at": job.last_finished_at,
+            "last_duration_ms": job.last_duration_ms,
+            "last_lag_ms": job.last_lag_ms,
+            "max_lag_ms": job.max_lag_ms,
+            "runs": job.runs,
+            "failures": job.failures,
+            "last_error": job.last_error,
+        }
+        for job in result.scalars().all()
+    ]
+    return FastJSONResponse({"node_id": NODE_ID, "is_leader": leader.is_leader, "jobs": jobs})
+
+@router.get("/cache")
+async def get_cache_stats(
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    # Hit/miss/eviction counters for sizing the response cache (this worker only)
+    return get_response_cache().stats()
+
+@router.get("/events")
+async def get_event_stats(
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    # Live /blogs/{id}/events connections and LISTEN status of this worker
+    return events.hub.stats()
+
+@router.get("/database")
+async def get_database_stats(
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    # Connection pool usage and replica lag as seen by this worker
+    return {"primary_pool": engine.pool.status(), "replicas": replicas.stats()}
 
 @router.get("/export/csv")
 async def export_csv(
     current_user: Annotated[User, Depends(get_current_admin_user)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    status: Optional[BlogStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    author: Optional[str] = None,
+    gzip: bool = False
 ):
-    # Fetch blogs with author relationship loaded would be ideal, 
-    # but here we might rely on lazy loading if session is open, or it might fail in async.
-    # Ideally should use options(joinedload(Blog.author)) in the service.
-    # For now, let's assume service returns what we need or we fetch.
-    blogs = await blog_service.get_blogs(db, limit=1000) 
-    
-    stream = io.StringIO()
-    writer = csv.writer(stream)
-    # matching fields from previous google sheets export
-    writer.writerow(["ID", "Title", "Description", "Content", "Author", "Created At", "Status"])
-    
-    for blog in blogs:
-        author_name = blog.author.username if blog.author else str(blog.author_id)
-        writer.writerow([
-            blog.id, 
-            blog.title, 
-            blog.description, 
-            blog.content[:100], # Truncated content 
-            author_name, 
-            blog.created_at,
-            blog.status
-        ])
-        
-    response = StreamingResponse(iter([stream.getvalue()]), media_type="text/csv")
-    response.headers["Content-Disposition"] = "attachment; filename=blogs_export.csv"
+    # Streams every matching blog (no row cap) straight from a server-side cursor
+    chunks = export_service.stream_blogs_csv(
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+        author=author,
+        gzip=gzip
+    )
+    if gzip:
+        response = StreamingResponse(chunks, media_type="application/gzip")
+        response.headers["Content-Disposition"] = "attachment; filename=blogs_export.csv.gz"
+    else:
+        response = StreamingResponse(chunks, media_type="text/csv")
+        response.headers["Content-Disposition"] = "attachment; filename=blogs_export.csv"
     return response
+
+@router.post("/import/blogs", response_model=BlogImportResult)
+async def import_blogs(
+    request: Request,
+    current_user: Annotated[User, Depends(get_current_admin_user)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    # Request body is NDJSON, read as it streams in. Rows without an author are
+    # attributed to the calling admin. For multi-million row loads use import_blogs.py.
+    return await import_service.import_blogs(
+        db, import_service.iter_lines(request.stream()), default_author_id=current_user.id
+    )
+
+@router.post("/exports", response_model=ExportJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def create_export(
+    export_in: ExportJobCreate,
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    # Full table dumps run in the background; poll GET /exports/{id} for progress
+    try:
+        return await export_service.submit_export(export_in.entity, export_in.format, created_by=current_user.username)
+    except export_service.ExportFormatUnavailable as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/exports", response_model=list[ExportJobOut])
+async def list_exports(
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    return export_service.list_jobs()
+
+@router.get("/exports/{id}", response_model=ExportJobOut)
+async def get_export(
+    id: str,
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    job = export_service.get_job(id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+@router.get("/exports/{id}/download")
+async def download_export(
+    id: str,
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    job = export_service.get_job(id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Export is {job['status']}")
+
+    # FileResponse handles Range requests, so large downloads can be resumed
+    media_type = "application/x-ndjson" if job["format"] == "ndjson" else "application/vnd.apache.parquet"
+    path = export_service.artifact_path(job)
+    return FileResponse(path, media_type=media_type, filename=f"{job['entity']}_export_{job['id']}.{path.suffix[1:]}")
+
+@router.get("/profiles", response_model=list[ProfileOut])
+async def list_profiles(
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    # Profiles are captured by sending any request with "X-Profile: 1" (see app/core/profiling.py)
+    return profile_service.list_profiles()
+
+@router.get("/profiles/{id}", response_model=ProfileDetail)
+async def get_profile(
+    id: str,
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    profile = profile_service.get_profile(id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@router.get("/profiles/{id}/download")
+async def download_profile(
+    id: str,
+    current_user: Annotated[User, Depends(get_current_admin_user)]
+):
+    # Raw cProfile stats, e.g. for python -m pstats or snakeviz
+    if not profile_service.get_profile(id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(profile_service.stats_path(id), media_type="application/octet-stream", filename=f"profile_{id}.prof")
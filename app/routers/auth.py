@@ -6,12 +6,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.schemas.auth import Token, UserCreate, RegisterResponse
 from app.services import auth_service
-from app.core.security import create_access_token
+from app.core.security import create_access_token, user_token_claims, PasswordHashingBusy
 from app.config import settings
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+def _hashing_busy():
+    # All bcrypt slots stayed busy for the whole queue timeout
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many login attempts in progress, please retry",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=Token)
 async def register(user: UserCreate, db: Annotated[AsyncSession, Depends(get_db)]):
     db_user = await auth_service.get_user_by_email(db, email=user.email)
@@ -22,11 +30,14 @@ async def register(user: UserCreate, db: Annotated[AsyncSession, Depends(get_db)
     if db_user_username:
         raise HTTPException(status_code=400, detail="Username already taken")
         
-    new_user = await auth_service.create_user(db, user)
+    try:
+        new_user = await auth_service.create_user(db, user)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": new_user.username}, expires_delta=access_token_expires
+        data=user_token_claims(new_user), expires_delta=access_token_expires
     )
     
     return {
@@ -43,7 +54,10 @@ class LoginRequest(BaseModel):
 
 @router.post("/login", response_model=Token)
 async def login(form_data: LoginRequest, db: Annotated[AsyncSession, Depends(get_db)]):
-    user = await auth_service.authenticate_user(db, email=form_data.email, password=form_data.password)
+    try:
+        user = await auth_service.authenticate_user(db, email=form_data.email, password=form_data.password)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,6 +66,6 @@ async def login(form_data: LoginRequest, db: Annotated[AsyncSession, Depends(get
         )
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data=user_token_claims(user), expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer", "user": user}
@@ -1,140 +1,221 @@
 from typing import Annotated, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc
 from app.database import get_db
 from app.models.user import User, UserRole
 from app.models.blog import Blog, BlogStatus
 # Ensure models are imported for relationships
-from app.schemas.blog import BlogCreate, BlogUpdate, BlogOut, BlogListResponse, CommentCreate, CommentOut, BlogDetail
+from app.schemas.blog import BlogCreate, BlogUpdate, BlogOut, BlogListResponse, BlogPartialListResponse, BlogBatchResponse, LikeResponse, CommentCreate, CommentOut, CommentListResponse, BlogDetail, BlogSearchResponse, MIN_BLOG_TAGS
 from app.models.comment import Comment
 from app.models.like import Like
 from app.services import blog_service
-from app.core.deps import get_current_user, get_current_active_user
+from app.core.deps import get_current_user, get_current_active_user, get_optional_user
+from app.core import cache, events, http_cache
+from app.config import settings
 from sqlalchemy.orm import selectinload
 
 router = APIRouter(prefix="/blogs", tags=["blogs"])
 
+# Comments embedded in the blog detail, the rest are paged from /{id}/comments
+DETAIL_COMMENTS_LIMIT = 20
+# Max ids per /batch request
+BATCH_MAX_IDS = 100
+# blogs.id is a Postgres integer; larger values would fail the query with a 500
+MAX_BLOG_ID = 2**31 - 1
 
+def render_json(model, data) -> bytes:
+    # Same output as the response_model path (aliases applied), rendered once for the cache
+    return model.model_validate(data, from_attributes=True).model_dump_json(by_alias=True).encode("utf-8")
 
-# Redefine logic for optional auth
-from app.core.security import settings
-from jose import jwt
-from fastapi.security import OAuth2PasswordBearer
-oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
-
-async def get_optional_user(token: Annotated[str | None, Depends(oauth2_scheme_optional)], db: Annotated[AsyncSession, Depends(get_db)]):
-    if not token:
-        return None
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None: return None
-    except:
-        return None
-        
-    result = await db.execute(select(User).where(User.username == username))
-    return result.scalars().first()
+def cached_response(request: Request, cached: bytes) -> Response:
+    # Anonymous cache hit: answer revalidations with 304 without touching the database
+    body, etag, last_modified = cache.unpack_response(cached)
+    headers = http_cache.cache_headers(etag, last_modified, public=True)
+    if http_cache.is_not_modified(request, etag, last_modified):
+        return http_cache.not_modified(headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("", response_model=BlogListResponse)
 async def read_blogs(
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
-    page: int = 1,
-    limit: int = 10,
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     tag: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    tag_match: str = Query("all", pattern="^(all|any)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated BlogOut fields to return"),
+    view: str = Query("full", pattern="^(full|summary)$"),
     current_user: Optional[User] = Depends(get_optional_user)
 ):
-    # Auto-publish scheduled blogs first
-    await blog_service.publish_scheduled_blogs(db)
+    # Sparse fieldsets: only the requested columns are fetched and serialized.
+    # view=summary is every field but content (excerpt and reading_time instead).
+    selected_fields = None
+    if fields:
+        try:
+            selected_fields = blog_service.parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif view == "summary":
+        selected_fields = blog_service.SUMMARY_FIELDS
 
-    query = select(Blog).order_by(desc(Blog.created_at))
-    
-    conditions = []
-    if search:
-        conditions.append(Blog.title.ilike(f"%{search}%"))
+    # Anonymous responses are identical for everyone, serve them from the response cache
+    cache_key = None
+    if current_user is None:
+        cache_key = cache.list_key({
+            "page": None if cursor else page,
+            "limit": limit,
+            "cursor": cursor,
+            "search": search,
+            "tags": (tags or []) + ([tag] if tag else []),
+            "tag_match": tag_match,
+            "fields": sorted(selected_fields) if selected_fields else None,
+        })
+        cached = await cache.get_response_cache().get(cache_key)
+        if cached is not None:
+            return cached_response(request, cached)
+
+    # Scheduled blogs are published by app.utils.scheduler.publisher at their due time,
+    # so listing stays a read-only transaction
+
+    # Pagination is pushed down into SQL:
+    # - cursor: keyset over (created_at, id), pass back next_cursor for the following page
+    # - page/limit: kept for compatibility, uses OFFSET/LIMIT plus a count query
+    # ?tag=a is kept for compatibility; ?tags=a&tags=b filters on several tags,
+    # requiring all of them (tag_match=all) or at least one (tag_match=any)
+    selected_tags = list(tags or [])
     if tag:
-        conditions.append(Blog.tags.contains([tag]))
+        selected_tags.append(tag)
 
-    # Visibility Logic
-    # 1. Published: ALL can see
-    # 2. Draft: Only Author can see
-    # 3. Scheduled: Only Author can see (until published)
+    try:
+        blogs_page, total, next_cursor = await blog_service.get_blogs_page(
+            db,
+            limit=limit,
+            page=page,
+            cursor=cursor,
+            search=search,
+            tags=selected_tags,
+            tag_match=tag_match,
+            current_user=current_user,
+            fields=selected_fields
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # The ETag covers the version of every row on the page, so a poll that
+    # changed nothing is answered here, before engagement and serialization.
+    # No Last-Modified: rows leaving the page wouldn't move it forward.
+    etag = http_cache.list_etag(blogs_page, current_user, total, next_cursor)
+    headers = http_cache.cache_headers(etag, public=current_user is None)
+    if http_cache.is_not_modified(request, etag):
+        return http_cache.not_modified(headers)
     
-    if current_user:
-        # Show (Published) OR (Draft/Scheduled AND Author is Me)
-        # Note: Admin might see everything? "Only owner OR admin" was for update/delete. 
-        # For list, let's assume Admin sees all too.
-        if current_user.role == UserRole.admin:
-            vis_condition = True # No filter
-        else:
-            vis_condition = (Blog.status == BlogStatus.published) | (Blog.author_id == current_user.id)
+    # Counts and like state for the whole page in a single query
+    await blog_service.attach_engagement(
+        db, blogs_page, current_user.id if current_user else None
+    )
+
+    data = {
+        "total": total,
+        "page": None if cursor else page,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "blogs": blogs_page
+    }
+
+    if selected_fields is not None:
+        # Unloaded columns must not be touched, so copy out just the requested fields
+        data["blogs"] = [{name: getattr(blog, name) for name in selected_fields} for blog in blogs_page]
+        body = BlogPartialListResponse.model_validate(data, from_attributes=True).model_dump_json(
+            by_alias=True, exclude_unset=True
+        ).encode("utf-8")
+    elif cache_key is not None:
+        body = render_json(BlogListResponse, data)
     else:
-        vis_condition = (Blog.status == BlogStatus.published)
+        response.headers.update(headers)
+        return data
 
-    if vis_condition is not True:
-        query = query.where(vis_condition)
-        
-    if conditions:
-        query = query.where(*conditions)
-    
-    # Check total count
-    # (Simplified count for now, proper count needs subquery)
-    # total = await db.scalar(select(func.count(Blog.id)).where(vis_condition)) 
-    # We ideally run the same query structure for count.
-    
-    # Eager load author for response
-    query = query.options(selectinload(Blog.author))
-    
-    # Count results (expensive but accurate)
-    result_all = await db.execute(query)
-    all_blogs = result_all.scalars().all()
-    total = len(all_blogs)
-    
-    # Slice for pagination in memory (since we fetched all for count - not optimal for production but safe for logic)
-    # Optimization: count query then limit query.
-    start = (page - 1) * limit
-    blogs_page = all_blogs[start : start + limit]
-    
-    # We also need likes_count and comments_count
-    # Since they are not columns but computed or relationships, we can map them.
-    # In Pydantic schema, we have likes_count.
-    # We can use hybrid_property or just calculate here.
-    # Let's use validation on return or simple attribute setting if model supports it.
-    
-    response_blogs = []
-    for blog in blogs_page:
-
-        # Simply:
-        from app.models.like import Like
-        from app.models.comment import Comment
-        likes_count = await db.scalar(select(func.count()).where(Like.blog_id == blog.id))
-        comments_count = await db.scalar(select(func.count()).where(Comment.blog_id == blog.id))
-        
-        blog.likes_count = likes_count
-        blog.comments_count = comments_count
-        response_blogs.append(blog)
+    if cache_key is not None:
+        tags_for_entry = [cache.LIST_TAG] + [cache.blog_tag(blog.id) for blog in blogs_page]
+        await cache.get_response_cache().set(cache_key, cache.pack_response(body, etag), tags_for_entry)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/batch", response_model=BlogBatchResponse)
+async def read_blogs_batch(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    ids: List[str] = Query(..., description="Comma-separated and/or repeated blog ids"),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    # One request (and three queries) instead of a GET /{id} per feed item
+    try:
+        blog_ids = list(dict.fromkeys(int(part) for value in ids for part in value.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be integers")
+    if any(not 1 <= blog_id <= MAX_BLOG_ID for blog_id in blog_ids):
+        raise HTTPException(status_code=400, detail=f"ids must be between 1 and {MAX_BLOG_ID}")
+    if len(blog_ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} ids per request")
+
+    blogs = await blog_service.get_blogs_by_ids(db, blog_ids, current_user)
+    await blog_service.attach_engagement(
+        db, blogs, current_user.id if current_user else None
+    )
+    found = {blog.id for blog in blogs}
+    return {
+        "blogs": blogs,
+        "missing": [blog_id for blog_id in blog_ids if blog_id not in found]
+    }
+
+@router.get("/search", response_model=BlogSearchResponse)
+async def search_blogs(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    q: str = Query(..., min_length=1),
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    rows, total = await blog_service.search_blogs(
+        db, q, limit=limit, page=page, current_user=current_user
+    )
+
+    blogs = [blog for blog, _, _ in rows]
+    await blog_service.attach_engagement(
+        db, blogs, current_user.id if current_user else None
+    )
+
+    results = []
+    for blog, rank, snippet in rows:
+        blog.rank = rank
+        blog.snippet = snippet
+        results.append(blog)
 
     return {
         "total": total,
         "page": page,
         "limit": limit,
-        "blogs": response_blogs
+        "results": results
     }
 
 @router.get("/{id}", response_model=BlogDetail)
 async def get_blog(
     id: int,
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Optional[User] = Depends(get_optional_user)
 ):
-    # Fetch blog with relations
-    # We need comments and their authors
-    query = select(Blog).where(Blog.id == id).options(
-        selectinload(Blog.author),
-        selectinload(Blog.comments).selectinload(Comment.user)
-    )
-    result = await db.execute(query)
+    if current_user is None:
+        cached = await cache.get_response_cache().get(cache.detail_key(id))
+        if cached is not None:
+            return cached_response(request, cached)
+
+    # Fetch blog with its author; comments are paginated separately
+    result = await db.execute(blog_service.blog_detail_query(id))
     blog = result.scalars().first()
     
     if not blog:
@@ -151,20 +232,29 @@ async def get_blog(
     if not is_visible:
         raise HTTPException(status_code=404, detail="Blog not found")
 
+    # Conditional GET: 304 before loading engagement and comments
+    etag, last_modified = http_cache.detail_validators(blog, current_user)
+    headers = http_cache.cache_headers(etag, last_modified, public=current_user is None)
+    if http_cache.is_not_modified(request, etag, last_modified):
+        return http_cache.not_modified(headers)
+
     # Counts & Extra Fields
-    blog.comments_count = len(blog.comments)
-    
-    likes_count = await db.scalar(select(func.count()).where(Like.blog_id == id))
-    blog.likes_count = likes_count
-    
-    blog.is_liked = False
-    if current_user:
-        user_like = await db.scalar(select(Like).where(
-            (Like.blog_id == id) & (Like.user_id == current_user.id)
-        ))
-        if user_like:
-            blog.is_liked = True
-            
+    await blog_service.attach_engagement(
+        db, [blog], current_user.id if current_user else None
+    )
+    blog.comments_page, blog.comments_next_cursor = await blog_service.get_comments_page(
+        db, id, DETAIL_COMMENTS_LIMIT
+    )
+
+    if current_user is None:
+        # Anonymous users can only reach published blogs, so this is safe to share
+        body = render_json(BlogDetail, blog)
+        await cache.get_response_cache().set(
+            cache.detail_key(id), cache.pack_response(body, etag, last_modified), [cache.blog_tag(id)]
+        )
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    response.headers.update(headers)
     return blog
 
 @router.post("", response_model=BlogOut)
@@ -173,8 +263,8 @@ async def create_blog(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    if len(blog.tags) < 2:
-        raise HTTPException(status_code=400, detail="Minimum 2 tags required")
+    if len(blog.tags) < MIN_BLOG_TAGS:
+        raise HTTPException(status_code=400, detail=f"Minimum {MIN_BLOG_TAGS} tags required")
         
     new_blog = await blog_service.create_blog(db, blog, current_user.id)
     # Reload with author
@@ -183,10 +273,6 @@ async def create_blog(
     res = await db.execute(select(Blog).options(selectinload(Blog.author)).where(Blog.id == new_blog.id))
     new_blog_loaded = res.scalars().first()
     
-    # Construct response with counts
-    new_blog_loaded.likes_count = 0
-    new_blog_loaded.comments_count = 0
-    
     return new_blog_loaded
 
 @router.put("/{id}", response_model=BlogOut)
@@ -204,13 +290,7 @@ async def update_blog(
     updated_blog = res.scalars().first()
     
     # Calculate counts
-    from app.models.like import Like
-    from app.models.comment import Comment
-    likes_count = await db.scalar(select(func.count()).where(Like.blog_id == id))
-    comments_count = await db.scalar(select(func.count()).where(Comment.blog_id == id))
-    
-    updated_blog.likes_count = likes_count
-    updated_blog.comments_count = comments_count
+    await blog_service.attach_engagement(db, [updated_blog], current_user.id)
     
     return updated_blog
 
@@ -226,31 +306,103 @@ async def delete_blog(
     return {"detail": "Blog deleted"}
 
 # --- Likes ---
-@router.post("/{id}/like")
+@router.post("/{id}/like", response_model=LikeResponse)
 async def like_blog(
     id: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    await blog_service.like_blog(db, id, current_user.id)
-    # Return updated count
-    from app.models.like import Like
-    count = await db.scalar(select(func.count()).where(Like.blog_id == id))
-    return {"likes_count": count}
+    likes_count = await blog_service.like_blog(db, id, current_user.id)
+    if likes_count is None:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    return {"likes_count": likes_count}
 
-@router.delete("/{id}/like")
+@router.delete("/{id}/like", response_model=LikeResponse)
 async def unlike_blog(
     id: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    await blog_service.unlike_blog(db, id, current_user.id)
-    from app.models.like import Like
-    count = await db.scalar(select(func.count()).where(Like.blog_id == id))
-    return {"likes_count": count}
+    likes_count = await blog_service.unlike_blog(db, id, current_user.id)
+    if likes_count is None:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    return {"likes_count": likes_count}
+
+
+# --- Live updates ---
+@router.get("/{id}/events")
+async def blog_events(
+    id: int,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """
+    Server-Sent Events stream of like counts and comments for one blog,
+    replacing polling of GET /blogs/{id}. See app/core/events.py for the events.
+    """
+    query = select(Blog.likes_count, Blog.comments_count).where(Blog.id == id)
+    visible = blog_service.visibility_condition(current_user)
+    if visible is not None:
+        query = query.where(visible)
+    row = (await db.execute(query)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    # The stream can stay open for hours, don't hold a pooled connection for it
+    await db.close()
+
+    if events.hub.subscriber_count >= settings.EVENTS_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=503, detail="Too many live connections, poll instead", headers={"Retry-After": "30"})
 
+    snapshot = {"likes_count": row.likes_count, "comments_count": row.comments_count}
+    return StreamingResponse(
+        events.stream(request, id, snapshot),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: stop nginx from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # --- Comments ---
+@router.get("/{id}/comments", response_model=CommentListResponse)
+async def read_comments(
+    id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Optional[User] = Depends(get_optional_user),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    if current_user is None:
+        key = cache.comments_key(id, {"limit": limit, "cursor": cursor})
+        cached = await cache.get_response_cache().get(key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+    # Same visibility rules as the blog itself
+    query = select(Blog.comments_count).where(Blog.id == id)
+    visible = blog_service.visibility_condition(current_user)
+    if visible is not None:
+        query = query.where(visible)
+    total = await db.scalar(query)
+    if total is None:
+        raise HTTPException(status_code=404, detail="Blog not found")
+
+    try:
+        comments, next_cursor = await blog_service.get_comments_page(db, id, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    payload = {
+        "total": total,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "comments": comments
+    }
+    if current_user is None:
+        body = render_json(CommentListResponse, payload)
+        await cache.get_response_cache().set(key, body, [cache.blog_tag(id)])
+        return Response(content=body, media_type="application/json")
+    return payload
+
 @router.post("/{id}/comments", response_model=CommentOut)
 async def create_comment(
     id: int,
@@ -258,15 +410,7 @@ async def create_comment(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    from app.models.comment import Comment
-    new_comment = Comment(
-        content=comment.content,
-        blog_id=id,
-        user_id=current_user.id
-    )
-    db.add(new_comment)
-    await db.commit()
-    await db.refresh(new_comment)
+    new_comment = await blog_service.create_comment(db, id, current_user.id, comment.content)
     return new_comment
 
 
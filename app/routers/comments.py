@@ -6,6 +6,7 @@ from app.database import get_db
 from app.models.comment import Comment
 from app.models.user import User, UserRole
 from app.core.deps import get_current_user
+from app.services import blog_service
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
@@ -25,6 +26,5 @@ async def delete_comment(
     if comment.user_id != current_user.id and current_user.role != UserRole.admin:
         raise HTTPException(status_code=403, detail="Not authorized")
         
-    await db.delete(comment)
-    await db.commit()
+    await blog_service.delete_comment(db, comment)
     return {"detail": "Comment deleted"}
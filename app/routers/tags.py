@@ -0,0 +1,18 @@
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.schemas.tag import TagListResponse
+from app.services import blog_service
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+@router.get("", response_model=TagListResponse)
+async def read_tags(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    limit: int = Query(50, ge=1, le=500),
+    prefix: Optional[str] = None
+):
+    # Published blog counts per tag, read from the tag_stats aggregate
+    tags = await blog_service.get_tag_counts(db, limit=limit, prefix=prefix)
+    return {"tags": tags}
@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.schemas.auth import UserOut, UserUpdate
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, invalidate_user
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -31,4 +31,6 @@ async def update_user_me(
     db.add(current_user)
     await db.commit()
     await db.refresh(current_user)
+    # Cached snapshot still holds the old username/avatar
+    await invalidate_user(current_user.id)
     return current_user
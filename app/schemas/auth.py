@@ -16,12 +16,18 @@ class UserUpdate(BaseModel):
     avatar_url: Optional[str] = None
 
 class UserOut(UserBase):
+    # Plain str on the way out: emails are validated when they are written, and
+    # EmailStr would re-run email_validator for every author of every blog we serialize
+    email: str
     id: int
     avatar_url: Optional[str] = None
     
     class Config:
         from_attributes = True
 
+class UserRoleUpdate(BaseModel):
+    role: UserRole
+
 class Token(BaseModel):
     access_token: str
     token_type: str
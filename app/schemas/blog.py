@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, field_validator
 from typing import List, Optional
 from datetime import datetime
 from app.models.blog import BlogStatus
@@ -23,6 +23,9 @@ class CommentOut(CommentBase):
         from_attributes = True
 
 # --- Blog Schemas ---
+# Enforced on create (blogs router) and on bulk import rows
+MIN_BLOG_TAGS = 2
+
 class BlogBase(BaseModel):
     title: str
     description: Optional[str] = None
@@ -35,6 +38,28 @@ class BlogBase(BaseModel):
 class BlogCreate(BlogBase):
     pass
 
+class BlogImportRow(BlogCreate):
+    # One NDJSON line of a bulk import (see app/services/import_service.py)
+    author_id: Optional[int] = None
+    author: Optional[str] = None # Username, alternative to author_id
+    created_at: Optional[datetime] = None # Keep the original publish date of migrated posts
+
+    @field_validator("tags")
+    @classmethod
+    def check_min_tags(cls, tags: List[str]) -> List[str]:
+        if len(tags) < MIN_BLOG_TAGS:
+            raise ValueError(f"Minimum {MIN_BLOG_TAGS} tags required")
+        return tags
+
+class BlogImportError(BaseModel):
+    line: int
+    error: str
+
+class BlogImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[BlogImportError] # Capped at IMPORT_MAX_ERRORS
+
 class BlogUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -50,20 +75,78 @@ class BlogOut(BlogBase):
     created_at: datetime
     updated_at: datetime
     updated_by: Optional[str] = None
+    excerpt: Optional[str] = None
+    reading_time: int = 1 # minutes
     likes_count: int = 0
     comments_count: int = 0
+    is_liked: bool = False # Always False for anonymous requests
     author: UserOut # Nested author details
 
     class Config:
         from_attributes = True
 
+class BlogPartial(BaseModel):
+    # A blog restricted to ?fields= / ?view=summary; dumped with exclude_unset so
+    # only the requested fields appear
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    content: Optional[str] = None
+    excerpt: Optional[str] = None
+    reading_time: Optional[int] = None
+    cover_image: Optional[str] = None
+    tags: Optional[List[str]] = None
+    status: Optional[BlogStatus] = None
+    scheduled_at: Optional[datetime] = None
+    author_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    updated_by: Optional[str] = None
+    likes_count: Optional[int] = None
+    comments_count: Optional[int] = None
+    is_liked: Optional[bool] = None
+    author: Optional[UserOut] = None
+
+class BlogPartialListResponse(BaseModel):
+    total: Optional[int] = None
+    page: Optional[int] = None
+    limit: int
+    next_cursor: Optional[str] = None
+    blogs: List[BlogPartial]
+
 class BlogListResponse(BaseModel):
+    total: Optional[int] = None # Not computed for cursor requests
+    page: Optional[int] = None # None for cursor requests
+    limit: int
+    next_cursor: Optional[str] = None # Pass as ?cursor= to fetch the next page
+    blogs: List[BlogOut]
+
+class LikeResponse(BaseModel):
+    likes_count: int
+
+class BlogBatchResponse(BaseModel):
+    blogs: List[BlogOut] # In the requested order
+    missing: List[int] = [] # Requested ids that don't exist or aren't visible
+
+class BlogSearchResult(BlogOut):
+    rank: float
+    snippet: Optional[str] = None # HTML: escaped matched fragments, terms wrapped in <mark></mark>
+
+class BlogSearchResponse(BaseModel):
     total: int
     page: int
     limit: int
-    blogs: List[BlogOut]
+    results: List[BlogSearchResult]
+
+class CommentListResponse(BaseModel):
+    total: int
+    limit: int
+    next_cursor: Optional[str] = None # Pass as ?cursor= to fetch the next page
+    comments: List[CommentOut]
 
 class BlogDetail(BlogOut):
     content: str # content is already in BlogBase, but confirm it's needed here. BlogOut has it.
-    comments: List[CommentOut] = []
-    is_liked: bool = False
+    # First page only (total is comments_count), the rest via GET /api/blogs/{id}/comments.
+    # Read from comments_page so the comments relationship is never loaded.
+    comments: List[CommentOut] = Field(default=[], validation_alias="comments_page")
+    comments_next_cursor: Optional[str] = None
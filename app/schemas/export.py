@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+from datetime import datetime
+
+class ExportJobCreate(BaseModel):
+    entity: Literal["blogs", "comments", "likes"]
+    format: Literal["ndjson", "parquet"] = "ndjson"
+
+class ExportJobOut(BaseModel):
+    id: str
+    entity: str
+    format: str
+    status: Literal["queued", "running", "completed", "failed"]
+    rows_total: Optional[int] = None
+    rows_written: int = 0
+    progress: Optional[float] = None # 0..1, None until rows_total is known
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+
+class ProfileStatement(BaseModel):
+    sql: str
+    duration_ms: float
+
+class ProfileFunction(BaseModel):
+    function: str
+    calls: int
+    total_ms: float # In the function itself
+    cumulative_ms: float # Including everything it called
+
+class ProfileOut(BaseModel):
+    id: str
+    method: str
+    path: str
+    query_string: str = ""
+    status_code: int
+    duration_ms: float
+    sql_count: int
+    sql_ms: float
+    created_by: str
+    created_at: datetime
+
+class ProfileDetail(ProfileOut):
+    statements: List[ProfileStatement] # In execution order, capped at PROFILE_MAX_STATEMENTS
+    top_functions: List[ProfileFunction] # By cumulative time
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import List
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class TagListResponse(BaseModel):
+    tags: List[TagCount]
@@ -0,0 +1,189 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, or_, case, delete, distinct, literal_column, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.analytics import AnalyticsHourly, RollupWatermark
+from app.models.blog import Blog, BlogStatus
+from app.models.user import User
+from app.models.like import Like
+from app.models.comment import Comment
+from app.config import settings
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+# Admin analytics are served from analytics_hourly instead of count(*) scans.
+#
+# refresh_rollups() recomputes whole hour buckets from the source tables:
+#   - every bucket from (watermark - grace) onwards, which covers rows committed
+#     late with a created_at just before the previous watermark
+#   - older buckets of blogs updated since then, whose status may have changed
+# Deletes (unlikes, deleted comments/blogs) in older buckets are only picked up
+# by the periodic full rebuild, see app/utils/scheduler.py.
+
+ROLLUP_NAME = "analytics_hourly"
+METRICS = ("new_users", "new_blogs", "published_blogs", "draft_blogs", "scheduled_blogs", "new_comments", "new_likes")
+GRANULARITIES = ("hour", "day")
+# More changed old buckets than this and a full rebuild is cheaper
+MAX_CHANGED_BUCKETS = 500
+
+# Inlined rather than bound so the same expression can appear in SELECT and GROUP BY
+_UTC = literal_column("'UTC'")
+
+def _truncate(unit: str, column):
+    # UTC bucket start as timestamptz, independent of the session time zone
+    return func.timezone(_UTC, func.date_trunc(literal_column(f"'{unit}'"), func.timezone(_UTC, column)))
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+def _window(column, since: Optional[datetime], buckets: List[datetime]):
+    # None means everything (full rebuild)
+    if since is None:
+        return None
+    conditions = [column >= since]
+    conditions += [and_(column >= bucket, column < bucket + timedelta(hours=1)) for bucket in buckets]
+    return or_(*conditions)
+
+def _source_counts(since: Optional[datetime], buckets: List[datetime]):
+    zero = literal_column("0")
+
+    def source(created_at, **counts):
+        columns = [_truncate("hour", created_at).label("bucket")]
+        columns += [counts.get(metric, zero).label(metric) for metric in METRICS]
+        query = select(*columns).group_by(literal_column("bucket"))
+        condition = _window(created_at, since, buckets)
+        if condition is not None:
+            query = query.where(condition)
+        return query
+
+    def by_status(status: BlogStatus):
+        return func.count().filter(Blog.status == status)
+
+    combined = union_all(
+        source(User.created_at, new_users=func.count()),
+        source(
+            Blog.created_at,
+            new_blogs=func.count(),
+            published_blogs=by_status(BlogStatus.published),
+            draft_blogs=by_status(BlogStatus.draft),
+            scheduled_blogs=by_status(BlogStatus.scheduled),
+        ),
+        source(Comment.created_at, new_comments=func.count()),
+        source(Like.created_at, new_likes=func.count()),
+    ).subquery()
+
+    return (
+        select(combined.c.bucket, *[func.sum(combined.c[metric]) for metric in METRICS])
+        .group_by(combined.c.bucket)
+    )
+
+async def refresh_rollups(db: AsyncSession, full: bool = False) -> int:
+    """
+    Brings analytics_hourly up to date and returns the number of buckets rewritten.
+    """
+    # The incremental refresh and the nightly rebuild can overlap; the second one waits
+    # here (until the first commits) instead of inserting the same buckets
+    await db.execute(select(func.pg_advisory_xact_lock(settings.ANALYTICS_ROLLUP_LOCK_ID)))
+    now = await db.scalar(select(func.now()))
+    watermark = await db.scalar(select(RollupWatermark.watermark).where(RollupWatermark.name == ROLLUP_NAME))
+
+    since = None
+    buckets: List[datetime] = []
+    if watermark is not None and not full:
+        cutoff = watermark - timedelta(seconds=settings.ANALYTICS_ROLLUP_GRACE_SECONDS)
+        since = _floor_hour(cutoff)
+        result = await db.execute(
+            select(distinct(_truncate("hour", Blog.created_at)))
+            .where(Blog.updated_at >= cutoff, Blog.created_at < since)
+            .limit(MAX_CHANGED_BUCKETS + 1)
+        )
+        buckets = list(result.scalars().all())
+        if len(buckets) > MAX_CHANGED_BUCKETS:
+            since, buckets = None, []
+
+    # Delete + insert in one transaction, readers keep seeing the old rows until commit
+    stale = delete(AnalyticsHourly)
+    condition = _window(AnalyticsHourly.bucket, since, buckets)
+    if condition is not None:
+        stale = stale.where(condition)
+    await db.execute(stale)
+    result = await db.execute(
+        pg_insert(AnalyticsHourly).from_select(["bucket", *METRICS], _source_counts(since, buckets))
+    )
+
+    stmt = pg_insert(RollupWatermark).values(name=ROLLUP_NAME, watermark=now)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[RollupWatermark.name],
+        set_={"watermark": stmt.excluded.watermark}
+    ))
+    await db.commit()
+    return result.rowcount
+
+async def get_analytics(
+    db: AsyncSession,
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """
+    All-time totals plus a time series for [start, end) in one query over the rollups.
+    Defaults to the last 30 days (daily) or 48 hours (hourly).
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError("Invalid granularity")
+    if start is None and end is None:
+        span = timedelta(days=30) if granularity == "day" else timedelta(hours=48)
+        start = datetime.now(timezone.utc) - span
+
+    in_range = []
+    if start is not None:
+        in_range.append(AnalyticsHourly.bucket >= start)
+    if end is not None:
+        in_range.append(AnalyticsHourly.bucket < end)
+
+    # Buckets outside the range get a NULL period: they still count towards
+    # the totals (the ROLLUP grand total row) but their group is dropped below
+    rows = select(
+        AnalyticsHourly,
+        case((and_(*in_range), _truncate(granularity, AnalyticsHourly.bucket))).label("period")
+    ).subquery()
+
+    as_of = select(RollupWatermark.watermark).where(RollupWatermark.name == ROLLUP_NAME).scalar_subquery()
+    query = (
+        select(
+            rows.c.period,
+            func.grouping(rows.c.period).label("is_total"),
+            as_of.label("as_of"),
+            *[func.coalesce(func.sum(rows.c[metric]), 0).label(metric) for metric in METRICS]
+        )
+        .group_by(func.rollup(rows.c.period))
+        .order_by(rows.c.period)
+    )
+    result = await db.execute(query)
+
+    totals = {metric: 0 for metric in METRICS}
+    series = []
+    as_of_value = None
+    for row in result.all():
+        as_of_value = row.as_of
+        counts = {metric: int(getattr(row, metric)) for metric in METRICS}
+        if row.is_total:
+            totals = counts
+        elif row.period is not None:
+            series.append({"period": row.period, **counts})
+
+    return {
+        "as_of": as_of_value,
+        "total_users": totals["new_users"],
+        "total_blogs": totals["new_blogs"],
+        "total_comments": totals["new_comments"],
+        "total_likes": totals["new_likes"],
+        "blogs_by_status": {
+            "published": totals["published_blogs"],
+            "draft": totals["draft_blogs"],
+            "scheduled": totals["scheduled_blogs"],
+        },
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "series": series,
+    }
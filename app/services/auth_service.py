@@ -1,8 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.schemas.auth import UserCreate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async, password_needs_rehash, PasswordHashingBusy
 
 async def get_user_by_email(db: AsyncSession, email: str):
     result = await db.execute(select(User).where(User.email == email))
@@ -13,7 +13,7 @@ async def get_user_by_username(db: AsyncSession, username: str):
     return result.scalars().first()
 
 async def create_user(db: AsyncSession, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -30,6 +30,23 @@ async def authenticate_user(db: AsyncSession, email: str, password: str):
     user = await get_user_by_email(db, email)
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return False
+    # Transparently move the stored hash to the configured bcrypt cost
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await get_password_hash_async(password)
+        except PasswordHashingBusy:
+            return user # Try again on a later login
+        db.add(user)
+        await db.commit()
+    return user
+
+async def set_user_role(db: AsyncSession, user: User, role: UserRole):
+    # Bumping token_version revokes tokens that still carry the old role claim
+    user.role = role
+    user.token_version = (user.token_version or 0) + 1
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
     return user
@@ -1,83 +1,340 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, or_
+from sqlalchemy import select, func, desc, or_, tuple_, literal, update, delete, values, column, union_all, Integer
+from sqlalchemy.orm import selectinload, joinedload, load_only
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert as pg_insert
 from app.models.blog import Blog, BlogStatus
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.models.like import Like
 from app.models.comment import Comment
-from app.schemas.blog import BlogCreate, BlogUpdate
-from datetime import datetime
-from typing import List, Optional
+from app.models.tag import TagStat
+from app.schemas.blog import BlogCreate, BlogUpdate, CommentOut
+from datetime import datetime, timedelta
+from collections import Counter
+import asyncio
+import html
+import logging
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.core import cache, events
+from app.config import settings
+from app.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration used by the blogs_search_vector_update trigger
+SEARCH_CONFIG = "english"
+# ts_headline marks matches with these (private use characters, stripped from the text
+# first); the snippet is HTML-escaped afterwards and they become <mark></mark>
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\ue000", "\ue001"
+SEARCH_HEADLINE_OPTIONS = f"MaxFragments=2, MaxWords=30, MinWords=10, StartSel=\"{HIGHLIGHT_START}\", StopSel=\"{HIGHLIGHT_STOP}\""
 
 async def get_blog(db: AsyncSession, blog_id: int):
     result = await db.execute(select(Blog).where(Blog.id == blog_id))
     return result.scalars().first()
 
-async def get_blogs(
-    db: AsyncSession, 
-    page: int = 1, 
-    limit: int = 10, 
-    search: Optional[str] = None, 
-    tag: Optional[str] = None,
-    current_user_id: Optional[int] = None
+def search_tsquery(search: str):
+    # websearch_to_tsquery accepts free text ("quoted phrases", -exclusions, or) and never raises
+    return func.websearch_to_tsquery(SEARCH_CONFIG, search)
+
+def search_condition(search: str):
+    # Matches against the GIN-indexed search_vector instead of ILIKE on title
+    return Blog.search_vector.op("@@")(search_tsquery(search))
+
+def visibility_condition(current_user: Optional[User]):
+    # Visibility Logic
+    # 1. Published: ALL can see
+    # 2. Draft: Only Author can see
+    # 3. Scheduled: Only Author can see (until published)
+    # Admin sees everything. Returns None when no filter is needed.
+    if current_user:
+        if current_user.role == UserRole.admin:
+            return None
+        return (Blog.status == BlogStatus.published) | (Blog.author_id == current_user.id)
+    return Blog.status == BlogStatus.published
+
+def tags_condition(tags: List[str], tag_match: str = "all"):
+    # Both forms are served by the GIN index on blogs.tags
+    # all -> tags @> ARRAY[...] (every tag present)
+    # any -> tags && ARRAY[...] (at least one tag present)
+    if tag_match == "any":
+        return Blog.tags.overlap(tags)
+    return Blog.tags.contains(tags)
+
+def blog_list_conditions(
+    search: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tag_match: str = "all",
+    current_user: Optional[User] = None
 ):
-    query = select(Blog).order_by(desc(Blog.created_at))
-    
-    # Filter by status:
-    # - published: visible to everyone
-    # - draft: visible only to owner (we need to handle this logic in router or here)
-    # The requirement says: 
-    # - published blogs publicly
-    # - draft blogs only to owner
-    # - scheduled blogs only when scheduled_at <= now() (which means they should be published?)
-    
-    # Actually, the scheduler should FLIP scheduled -> published.
-    # But if looking at "scheduled" blogs:
-    # "scheduled blogs only when scheduled_at <= now()" -> this implies they are effectively published.
-    
-    # Let's handle the visibility logic.
-    # If no current_user, only show published.
-    # If current_user, show published OR (draft AND author_id == current_user) OR (scheduled AND author_id == current_user).
-    
-    # Wait, the requirement is simpler: "Only show: published blogs publicly, draft blogs only to owner..."
-    # So we filter generally.
-    
     conditions = []
-    
-    # Search
+    vis_condition = visibility_condition(current_user)
+    if vis_condition is not None:
+        conditions.append(vis_condition)
+    return conditions + filter_conditions(search, tags, tag_match)
+
+def filter_conditions(search: Optional[str] = None, tags: Optional[List[str]] = None, tag_match: str = "all"):
+    # The request's own filters, without visibility
+    conditions = []
     if search:
-        conditions.append(Blog.title.ilike(f"%{search}%"))
-        
-    # Tag
-    if tag:
-        # PostgreSQL array check
-        conditions.append(Blog.tags.contains([tag])) # or use ANY logic if needed by dialect
-    
-    # Apply filters
-    if conditions:
-        query = query.where(*conditions)
-
-    # We need to fetch author as well for the response
-    # SQLAlchemy lazy loading might work, but eager loading is better for async
-    from sqlalchemy.orm import selectinload
-    query = query.options(selectinload(Blog.author))
- 
-    # Pagination
-    # First get total count
-    # count_query = select(func.count()).select_from(query.subquery()) # approximate
-    # To get accurate count with filters:
-    # We execute a separate count query
-    
-    # TODO: Refine count query
-    
-    # Apply limit/offset
-    offset = (page - 1) * limit
-    query = query.offset(offset).limit(limit)
-    
+        conditions.append(search_condition(search))
+    if tags:
+        conditions.append(tags_condition(tags, tag_match))
+    return conditions
+
+# Sparse fieldsets for list responses (?fields= / ?view=summary).
+# Names are BlogOut fields; is_liked is computed and author is the relationship.
+BLOG_FIELDS = {
+    "id", "title", "description", "content", "excerpt", "reading_time", "cover_image",
+    "tags", "status", "scheduled_at", "author_id", "created_at", "updated_at",
+    "updated_by", "likes_count", "comments_count", "is_liked", "author",
+}
+# Everything a blog card needs, without the (large) content column
+SUMMARY_FIELDS = BLOG_FIELDS - {"content"}
+# Always loaded: the keyset cursor is built from created_at and id,
+# the list ETag from the version columns (see app/core/http_cache.py)
+_REQUIRED_COLUMNS = ("id", "created_at", "updated_at", "likes_count", "comments_count", "counters_updated_at")
+
+def parse_fields(fields: str) -> set:
+    """
+    Parses a comma-separated ?fields= value. Raises ValueError for unknown names.
+    """
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - BLOG_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested | {"id"}
+
+def blog_field_options(fields: Optional[Iterable[str]] = None) -> list:
+    # Loader options that fetch only the requested columns and the author only if asked for
+    if fields is None:
+        return [selectinload(Blog.author)]
+    fields = set(fields)
+    columns = {name for name in fields if name in Blog.__table__.columns} | set(_REQUIRED_COLUMNS)
+    options = [load_only(*(getattr(Blog, name) for name in sorted(columns)))]
+    if "author" in fields:
+        options.append(selectinload(Blog.author))
+    return options
+
+def blog_list_query(
+    limit: int,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    search: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tag_match: str = "all",
+    current_user: Optional[User] = None,
+    fields: Optional[Iterable[str]] = None
+):
+    """
+    Builds the SELECT for one page of the blog list, newest first.
+    With a cursor we seek past (created_at, id) instead of using OFFSET,
+    so deep pages cost the same as the first one.
+    Fetches limit + 1 rows so the caller can tell whether there is a next page.
+    With fields only those columns are fetched (see blog_field_options).
+    Raises ValueError for a malformed cursor.
+    """
+    query = (
+        select(Blog)
+        .where(*blog_list_conditions(search, tags, tag_match, current_user))
+        .order_by(desc(Blog.created_at), desc(Blog.id))
+        .options(*blog_field_options(fields))
+    )
+
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(Blog.created_at, Blog.id) < tuple_(cursor_created_at, cursor_id))
+    else:
+        query = query.offset((page - 1) * limit)
+
+    return query.limit(limit + 1)
+
+def blog_count_query(
+    search: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tag_match: str = "all",
+    current_user: Optional[User] = None
+):
+    if current_user is not None and current_user.role != UserRole.admin:
+        # "published OR mine" can't use an index and scans the whole table; count the
+        # two disjoint halves instead, each served by its own index
+        filters = filter_conditions(search, tags, tag_match)
+        published = select(func.count(Blog.id)).where(Blog.status == BlogStatus.published, *filters)
+        own = select(func.count(Blog.id)).where(
+            Blog.author_id == current_user.id, Blog.status != BlogStatus.published, *filters
+        )
+        return select(published.scalar_subquery() + own.scalar_subquery())
+    return select(func.count(Blog.id)).where(*blog_list_conditions(search, tags, tag_match, current_user))
+
+def blog_detail_query(blog_id: int):
+    # The blog and its author; comments are paginated separately
+    return select(Blog).where(Blog.id == blog_id).options(selectinload(Blog.author))
+
+async def get_blogs_page(
+    db: AsyncSession,
+    limit: int,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    search: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tag_match: str = "all",
+    current_user: Optional[User] = None,
+    fields: Optional[Iterable[str]] = None
+):
+    """
+    Returns (blogs, total, next_cursor).
+    total is only computed for page/limit requests; cursor requests skip the count.
+    """
+    query = blog_list_query(limit, page, cursor, search, tags, tag_match, current_user, fields)
     result = await db.execute(query)
-    blogs = result.scalars().all()
-    
+    blogs = list(result.scalars().all())
+
+    next_cursor = None
+    if len(blogs) > limit:
+        blogs = blogs[:limit]
+        next_cursor = encode_cursor(blogs[-1].created_at, blogs[-1].id)
+
+    total = None
+    if not cursor:
+        total = await db.scalar(blog_count_query(search, tags, tag_match, current_user))
+
+    return blogs, total, next_cursor
+
+async def search_blogs(
+    db: AsyncSession,
+    q: str,
+    limit: int,
+    page: int = 1,
+    current_user: Optional[User] = None
+):
+    """
+    Full-text search over title/tags/description/content, best match first.
+    Returns (rows, total) where rows are (blog, rank, snippet) for the requested page.
+    Only blogs visible to current_user are considered.
+    """
+    tsquery = search_tsquery(q)
+    conditions = [Blog.search_vector.op("@@")(tsquery)]
+    vis_condition = visibility_condition(current_user)
+    if vis_condition is not None:
+        conditions.append(vis_condition)
+
+    rank = func.ts_rank(Blog.search_vector, tsquery)
+    # Rank and paginate on ids first so ts_headline only runs for the rows we return
+    ranked = (
+        select(Blog.id.label("id"), rank.label("rank"))
+        .where(*conditions)
+        .order_by(desc(rank), desc(Blog.id))
+        .offset((page - 1) * limit)
+        .limit(limit)
+        .subquery()
+    )
+    snippet = func.ts_headline(
+        literal(SEARCH_CONFIG, REGCONFIG),
+        func.translate(func.coalesce(Blog.description, "") + " " + Blog.content, HIGHLIGHT_START + HIGHLIGHT_STOP, ""),
+        tsquery,
+        SEARCH_HEADLINE_OPTIONS
+    )
+    query = (
+        select(Blog, ranked.c.rank, snippet)
+        .join(ranked, ranked.c.id == Blog.id)
+        .order_by(desc(ranked.c.rank), desc(Blog.id))
+        .options(selectinload(Blog.author))
+    )
+    result = await db.execute(query)
+    rows = [(blog, blog_rank, highlight_snippet(raw)) for blog, blog_rank, raw in result.all()]
+
+    total = await db.scalar(select(func.count(Blog.id)).where(*conditions))
+    return rows, total
+
+def highlight_snippet(raw: Optional[str]) -> Optional[str]:
+    # Blog text is user content: escape all of it, only our own <mark> tags stay markup
+    if raw is None:
+        return None
+    return html.escape(raw).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+async def get_blogs_by_ids(db: AsyncSession, blog_ids: List[int], current_user: Optional[User] = None):
+    """
+    Loads many blogs with their authors in a fixed number of queries,
+    in the order requested. Ids that don't exist or aren't visible are skipped.
+    """
+    if not blog_ids:
+        return []
+    query = (
+        select(Blog)
+        .where(Blog.id.in_(blog_ids))
+        .options(selectinload(Blog.author))
+    )
+    visible = visibility_condition(current_user)
+    if visible is not None:
+        query = query.where(visible)
+    result = await db.execute(query)
+    by_id = {blog.id: blog for blog in result.scalars().all()}
+    return [by_id[blog_id] for blog_id in blog_ids if blog_id in by_id]
+
+def liked_blog_ids_query(user_id: int, blog_ids: List[int]):
+    # Served by ix_likes_user_id_blog_id
+    return select(Like.blog_id).where(Like.user_id == user_id, Like.blog_id.in_(blog_ids))
+
+async def attach_engagement(db: AsyncSession, blogs: List[Blog], user_id: Optional[int] = None):
+    # likes_count / comments_count are already loaded as columns,
+    # so only is_liked needs a query (and none at all for anonymous users)
+    liked_ids = set()
+    if user_id is not None and blogs:
+        result = await db.execute(liked_blog_ids_query(user_id, [blog.id for blog in blogs]))
+        liked_ids = set(result.scalars().all())
+    for blog in blogs:
+        blog.is_liked = blog.id in liked_ids
     return blogs
 
+def _published_tags(status: BlogStatus, tags: Optional[List[str]]):
+    # The tags a blog contributes to tag_stats: its distinct tags while published, else none
+    return set(tags or []) if status == BlogStatus.published else set()
+
+async def _adjust_tag_counts(db: AsyncSession, deltas: Dict[str, int]):
+    # Applies per-tag deltas to tag_stats with one upsert (in tag order to avoid deadlocks)
+    rows = [{"tag": tag, "published_count": n} for tag, n in sorted(deltas.items()) if n]
+    if not rows:
+        return
+    stmt = pg_insert(TagStat).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TagStat.tag],
+        set_={"published_count": TagStat.published_count + stmt.excluded.published_count}
+    )
+    await db.execute(stmt)
+
+async def get_tag_counts(db: AsyncSession, limit: int = 50, prefix: Optional[str] = None):
+    # Served from the tag_stats aggregate, most used first
+    query = (
+        select(TagStat.tag, TagStat.published_count)
+        .where(TagStat.published_count > 0)
+        .order_by(desc(TagStat.published_count), TagStat.tag)
+        .limit(limit)
+    )
+    if prefix:
+        query = query.where(TagStat.tag.startswith(prefix, autoescape=True))
+    result = await db.execute(query)
+    return [{"tag": tag, "count": count} for tag, count in result.all()]
+
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = 200
+
+def summarize_content(content: str):
+    """
+    Returns (excerpt, reading_time) for a blog body: the first EXCERPT_LENGTH
+    characters cut at a word boundary, and minutes to read at WORDS_PER_MINUTE.
+    The backfill in migration 04c11347e6d6 mirrors this in SQL.
+    """
+    text = " ".join((content or "").split())
+    reading_time = max(1, math.ceil(len(text.split()) / WORDS_PER_MINUTE))
+    if len(text) > EXCERPT_LENGTH:
+        text = text[:EXCERPT_LENGTH].rsplit(" ", 1)[0] + "…"
+    return text, reading_time
+
+def _notify_schedule(scheduled_at: Optional[datetime]):
+    # Re-arms the due-time publisher (imported here to avoid a cycle with app.utils.scheduler)
+    from app.utils.scheduler import publisher
+    publisher.notify(scheduled_at)
+
 async def create_blog(db: AsyncSession, blog: BlogCreate, author_id: int):
     # Logic: If scheduled_at > now, status = scheduled
     # Logic: If scheduled_at > now, status = scheduled
@@ -85,13 +342,21 @@ async def create_blog(db: AsyncSession, blog: BlogCreate, author_id: int):
     if blog.scheduled_at and blog.scheduled_at > datetime.now(blog.scheduled_at.tzinfo):
         blog_data["status"] = BlogStatus.scheduled
         
+    blog_data["excerpt"], blog_data["reading_time"] = summarize_content(blog.content)
+
     db_blog = Blog(
         **blog_data,
         author_id=author_id
     )
     db.add(db_blog)
+    await _adjust_tag_counts(db, Counter(_published_tags(db_blog.status, db_blog.tags)))
     await db.commit()
     await db.refresh(db_blog)
+    # Drafts and scheduled posts never show up in anonymous responses
+    if db_blog.status == BlogStatus.published:
+        await cache.invalidate(cache.LIST_TAG)
+    if db_blog.status == BlogStatus.scheduled:
+        _notify_schedule(db_blog.scheduled_at)
     return db_blog
 
 async def update_blog(db: AsyncSession, blog_id: int, blog_update: BlogUpdate, user: User):
@@ -103,15 +368,28 @@ async def update_blog(db: AsyncSession, blog_id: int, blog_update: BlogUpdate, u
     if db_blog.author_id != user.id and user.role != "admin":
         return None # Or raise in router
         
+    was_published = db_blog.status == BlogStatus.published
+    old_tags = _published_tags(db_blog.status, db_blog.tags)
+
     update_data = blog_update.model_dump(exclude_unset=True)
+    if update_data.get("content") is not None:
+        update_data["excerpt"], update_data["reading_time"] = summarize_content(update_data["content"])
     for key, value in update_data.items():
         setattr(db_blog, key, value)
         
     db_blog.updated_by = user.username
     
     db.add(db_blog)
+    tag_deltas = Counter(_published_tags(db_blog.status, db_blog.tags))
+    tag_deltas.subtract(old_tags)
+    await _adjust_tag_counts(db, tag_deltas)
     await db.commit()
     await db.refresh(db_blog)
+    if was_published or db_blog.status == BlogStatus.published:
+        # Title/tags/status edits can move the blog in or out of any list page
+        await cache.invalidate(cache.LIST_TAG, cache.blog_tag(blog_id))
+    if db_blog.status == BlogStatus.scheduled and ("scheduled_at" in update_data or "status" in update_data):
+        _notify_schedule(db_blog.scheduled_at)
     return db_blog
 
 async def delete_blog(db: AsyncSession, blog_id: int, user: User):
@@ -122,45 +400,362 @@ async def delete_blog(db: AsyncSession, blog_id: int, user: User):
     if db_blog.author_id != user.id and user.role != "admin":
         return None
         
+    tag_deltas = Counter()
+    tag_deltas.subtract(_published_tags(db_blog.status, db_blog.tags))
+    await _adjust_tag_counts(db, tag_deltas)
+    was_published = db_blog.status == BlogStatus.published
     await db.delete(db_blog)
     await db.commit()
+    if was_published:
+        await cache.invalidate(cache.LIST_TAG, cache.blog_tag(blog_id))
     return True
 
-async def like_blog(db: AsyncSession, blog_id: int, user_id: int):
-    # Check if already liked
-    result = await db.execute(select(Like).where(Like.blog_id == blog_id, Like.user_id == user_id))
-    existing_like = result.scalars().first()
-    if existing_like:
-        return False # Already liked
-        
-    new_like = Like(blog_id=blog_id, user_id=user_id)
-    db.add(new_like)
+async def _bump_counters(db: AsyncSession, blog_id: int, likes: int = 0, comments: int = 0):
+    # Atomic in-place increment; updated_at is kept since engagement is not an edit of the post
+    await db.execute(
+        update(Blog)
+        .where(Blog.id == blog_id)
+        .values(
+            likes_count=Blog.likes_count + likes,
+            comments_count=Blog.comments_count + comments,
+            counters_updated_at=func.now(),
+            updated_at=Blog.updated_at
+        )
+    )
+
+def like_statement(blog_id: int, user_id: int, liked: bool):
+    """
+    Likes (INSERT ... ON CONFLICT DO NOTHING) or unlikes (DELETE) in a single statement,
+    bumping likes_count only when a row actually changed.
+    Selects (likes_count, changed); no row when the blog doesn't exist.
+    """
+    if liked:
+        changed = (
+            pg_insert(Like)
+            .from_select(["blog_id", "user_id"], select(Blog.id, literal(user_id)).where(Blog.id == blog_id))
+            .on_conflict_do_nothing(index_elements=[Like.blog_id, Like.user_id])
+            .returning(Like.blog_id)
+            .cte("changed")
+        )
+    else:
+        changed = (
+            delete(Like)
+            .where(Like.blog_id == blog_id, Like.user_id == user_id)
+            .returning(Like.blog_id)
+            .cte("changed")
+        )
+    bumped = (
+        update(Blog)
+        .where(Blog.id == changed.c.blog_id)
+        .values(
+            likes_count=Blog.likes_count + (1 if liked else -1),
+            counters_updated_at=func.now(),
+            updated_at=Blog.updated_at
+        )
+        .returning(Blog.likes_count)
+        .cte("bumped")
+    )
+    # The outer SELECT still sees the row as it was before the statement,
+    # so the new count has to come from bumped
+    return select(
+        func.coalesce(select(bumped.c.likes_count).scalar_subquery(), Blog.likes_count),
+        select(bumped.c.likes_count).exists()
+    ).where(Blog.id == blog_id)
+
+async def _set_like(db: AsyncSession, blog_id: int, user_id: int, liked: bool) -> Optional[int]:
+    row = (await db.execute(like_statement(blog_id, user_id, liked))).first()
     await db.commit()
-    return True
+    if row is None:
+        return None
+    likes_count, changed = row
+    if changed:
+        await cache.invalidate(cache.blog_tag(blog_id))
+        events.hub.publish(blog_id, "likes", {"likes_count": likes_count})
+    return likes_count
 
-async def unlike_blog(db: AsyncSession, blog_id: int, user_id: int):
-    result = await db.execute(select(Like).where(Like.blog_id == blog_id, Like.user_id == user_id))
-    existing_like = result.scalars().first()
-    if not existing_like:
-        return False
-        
-    await db.delete(existing_like)
+async def like_blog(db: AsyncSession, blog_id: int, user_id: int) -> Optional[int]:
+    """
+    Idempotent: liking twice is a no-op. Returns the new likes_count, None if the blog doesn't exist.
+    """
+    if like_buffer.running:
+        return await like_buffer.submit(blog_id, user_id, True)
+    return await _set_like(db, blog_id, user_id, True)
+
+async def unlike_blog(db: AsyncSession, blog_id: int, user_id: int) -> Optional[int]:
+    # Same as like_blog, unliking a blog that isn't liked is a no-op
+    if like_buffer.running:
+        return await like_buffer.submit(blog_id, user_id, False)
+    return await _set_like(db, blog_id, user_id, False)
+
+async def apply_like_changes(db: AsyncSession, changes: Dict[Tuple[int, int], bool]) -> Dict[int, int]:
+    """
+    Applies many like (True) / unlike (False) changes keyed by (blog_id, user_id) in one
+    transaction: a multi-row upsert, a multi-row delete and one counter update.
+    Returns {blog_id: likes_count} for the blogs that exist.
+    """
+    deltas = []
+    for liked, name in ((True, "liked"), (False, "unliked")):
+        pairs = [pair for pair, value in changes.items() if value is liked]
+        if not pairs:
+            continue
+        rows = values(column("blog_id", Integer), column("user_id", Integer), name=f"{name}_pairs").data(pairs)
+        if liked:
+            changed = (
+                pg_insert(Like)
+                .from_select(["blog_id", "user_id"], select(rows.c.blog_id, rows.c.user_id).join(Blog, Blog.id == rows.c.blog_id))
+                .on_conflict_do_nothing(index_elements=[Like.blog_id, Like.user_id])
+                .returning(Like.blog_id)
+                .cte(name)
+            )
+        else:
+            changed = (
+                delete(Like)
+                .where(Like.blog_id == rows.c.blog_id, Like.user_id == rows.c.user_id)
+                .returning(Like.blog_id)
+                .cte(name)
+            )
+        deltas.append(select(changed.c.blog_id, literal(1 if liked else -1).label("delta")))
+
+    combined = (deltas[0] if len(deltas) == 1 else union_all(*deltas)).subquery("deltas")
+    totals = (
+        select(combined.c.blog_id, func.sum(combined.c.delta).label("delta"))
+        .group_by(combined.c.blog_id)
+        .subquery("totals")
+    )
+    result = await db.execute(
+        update(Blog)
+        .where(Blog.id == totals.c.blog_id, totals.c.delta != 0)
+        .values(
+            likes_count=Blog.likes_count + totals.c.delta,
+            counters_updated_at=func.now(),
+            updated_at=Blog.updated_at
+        )
+        .returning(Blog.id)
+    )
+    changed_ids = set(result.scalars().all())
+    blog_ids = {blog_id for blog_id, _ in changes}
+    result = await db.execute(select(Blog.id, Blog.likes_count).where(Blog.id.in_(blog_ids)))
+    counts = dict(result.all())
+    await db.commit()
+
+    if changed_ids:
+        await cache.invalidate(*(cache.blog_tag(blog_id) for blog_id in changed_ids))
+        for blog_id in changed_ids:
+            events.hub.publish(blog_id, "likes", {"likes_count": counts[blog_id]})
+    return counts
+
+class LikeWriteBuffer:
+    """
+    Write-behind mode for likes (LIKE_WRITE_BEHIND_ENABLED). Requests queue their change
+    and wait; a background task writes whatever was queued in the last
+    LIKE_FLUSH_INTERVAL_MS with apply_like_changes and answers each request with its
+    blog's new count once that transaction has committed.
+    A like and unlike of the same pair in one batch collapse into the last one.
+    """
+
+    def __init__(self):
+        # (blog_id, user_id) -> (liked, waiting requests)
+        self.pending: Dict[Tuple[int, int], Tuple[bool, List[asyncio.Future]]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def submit(self, blog_id: int, user_id: int, liked: bool) -> Optional[int]:
+        future = asyncio.get_running_loop().create_future()
+        _, waiting = self.pending.get((blog_id, user_id), (liked, []))
+        waiting.append(future)
+        self.pending[(blog_id, user_id)] = (liked, waiting)
+        self._wakeup.set()
+        return await future
+
+    async def flush(self):
+        while self.pending:
+            keys = list(self.pending)[:settings.LIKE_FLUSH_MAX_SIZE]
+            batch = {key: self.pending.pop(key) for key in keys}
+            try:
+                async with AsyncSessionLocal() as db:
+                    counts = await apply_like_changes(db, {key: liked for key, (liked, _) in batch.items()})
+            except Exception as e:
+                logger.exception("Like batch of %d failed", len(batch))
+                for _, waiting in batch.values():
+                    for future in waiting:
+                        if not future.done():
+                            future.set_exception(e)
+                continue
+            for (blog_id, _), (_, waiting) in batch.items():
+                for future in waiting:
+                    # The client may have gone away in the meantime
+                    if not future.done():
+                        future.set_result(counts.get(blog_id))
+
+    async def run(self):
+        while True:
+            await self._wakeup.wait()
+            # Give concurrent requests a moment to join the batch
+            await asyncio.sleep(settings.LIKE_FLUSH_INTERVAL_MS / 1000)
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Write out anything still queued so no waiting request is dropped
+        await self.flush()
+
+like_buffer = LikeWriteBuffer()
+
+def comment_page_query(blog_id: int, limit: int, cursor: Optional[str] = None):
+    """
+    Builds the SELECT for one page of a blog's comments, oldest first, seeking
+    past the (created_at, id) cursor. Served by ix_comments_blog_id_created_at_id.
+    Fetches limit + 1 rows; raises ValueError for a malformed cursor.
+    """
+    query = (
+        select(Comment)
+        .where(Comment.blog_id == blog_id)
+        .order_by(Comment.created_at, Comment.id)
+        .options(joinedload(Comment.user))
+    )
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(Comment.created_at, Comment.id) > tuple_(cursor_created_at, cursor_id))
+    return query.limit(limit + 1)
+
+async def get_comments_page(db: AsyncSession, blog_id: int, limit: int, cursor: Optional[str] = None):
+    """
+    Returns (comments, next_cursor). The total is Blog.comments_count.
+    """
+    result = await db.execute(comment_page_query(blog_id, limit, cursor))
+    comments = list(result.scalars().all())
+
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        last = comments[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return comments, next_cursor
+
+async def create_comment(db: AsyncSession, blog_id: int, user_id: int, content: str):
+    new_comment = Comment(
+        content=content,
+        blog_id=blog_id,
+        user_id=user_id
+    )
+    db.add(new_comment)
+    await _bump_counters(db, blog_id, comments=1)
     await db.commit()
+    await cache.invalidate(cache.blog_tag(blog_id))
+    await db.refresh(new_comment)
+    await db.refresh(new_comment, ["user"])
+    events.hub.publish(blog_id, "comment", CommentOut.model_validate(new_comment).model_dump(mode="json", by_alias=True))
+    return new_comment
+
+async def delete_comment(db: AsyncSession, comment: Comment):
+    await db.delete(comment)
+    await _bump_counters(db, comment.blog_id, comments=-1)
+    await db.commit()
+    await cache.invalidate(cache.blog_tag(comment.blog_id))
+    events.hub.publish(comment.blog_id, "comment_deleted", {"id": comment.id})
     return True
 
-async def get_metrics(db: AsyncSession):
-    # Admin metrics
-    total_users = await db.scalar(select(func.count(User.id)))
-    total_blogs = await db.scalar(select(func.count(Blog.id)))
-    total_comments = await db.scalar(select(func.count(Comment.id)))
-    total_likes = await db.scalar(select(func.count(Like.id)))
-    
-    return {
-        "total_users": total_users,
-        "total_blogs": total_blogs,
-        "total_comments": total_comments,
-        "total_likes": total_likes
-    }
+async def reconcile_engagement_counters(db: AsyncSession):
+    """
+    Repairs drift between the counter columns on blogs and the likes/comments tables
+    in one bulk UPDATE. Returns the number of blogs that were fixed.
+    Blogs whose counters were bumped within COUNTER_RECONCILE_GRACE_SECONDS are skipped:
+    the counts were read before that write and would undo it.
+    """
+    likes = select(Like.blog_id, func.count().label("n")).group_by(Like.blog_id).subquery()
+    comments = select(Comment.blog_id, func.count().label("n")).group_by(Comment.blog_id).subquery()
+    actual = (
+        select(
+            Blog.id.label("id"),
+            func.coalesce(likes.c.n, 0).label("likes_count"),
+            func.coalesce(comments.c.n, 0).label("comments_count"),
+        )
+        .outerjoin(likes, likes.c.blog_id == Blog.id)
+        .outerjoin(comments, comments.c.blog_id == Blog.id)
+        .subquery()
+    )
+
+    stmt = (
+        update(Blog)
+        .where(Blog.id == actual.c.id)
+        .where(
+            (Blog.likes_count != actual.c.likes_count)
+            | (Blog.comments_count != actual.c.comments_count)
+        )
+        .where(
+            Blog.counters_updated_at.is_(None)
+            | (Blog.counters_updated_at < func.now() - timedelta(seconds=settings.COUNTER_RECONCILE_GRACE_SECONDS))
+        )
+        .values(
+            likes_count=actual.c.likes_count,
+            comments_count=actual.c.comments_count,
+            counters_updated_at=func.now(),
+            updated_at=Blog.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+async def reconcile_tag_stats(db: AsyncSession):
+    """
+    Rebuilds tag_stats from the published blogs, touching only rows that drifted.
+    """
+    published_tags = (
+        select(func.unnest(Blog.tags).label("tag"), Blog.id.label("blog_id"))
+        .where(Blog.status == BlogStatus.published)
+        .subquery()
+    )
+    actual = (
+        select(published_tags.c.tag, func.count(func.distinct(published_tags.c.blog_id)))
+        .group_by(published_tags.c.tag)
+    )
+
+    upsert = pg_insert(TagStat).from_select(["tag", "published_count"], actual)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[TagStat.tag],
+        set_={"published_count": upsert.excluded.published_count},
+        where=TagStat.published_count != upsert.excluded.published_count
+    )
+    await db.execute(upsert)
+    await db.execute(
+        delete(TagStat).where(TagStat.tag.not_in(select(published_tags.c.tag)))
+    )
+    await db.commit()
+
+def publish_due_statement():
+    # Rows are claimed with FOR UPDATE SKIP LOCKED, so concurrent publishers
+    # (e.g. during a leader handover) never block on or double-publish a row.
+    # The due rows are found through the partial index ix_blogs_scheduled_at_scheduled.
+    due = (
+        select(Blog.id)
+        .where(Blog.status == BlogStatus.scheduled)
+        .where(Blog.scheduled_at <= func.now())
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Blog)
+        .where(Blog.id.in_(due.scalar_subquery()))
+        .values(status=BlogStatus.published)
+        .returning(Blog.id, Blog.tags)
+        .execution_options(synchronize_session=False)
+    )
 
 async def publish_scheduled_blogs(db: AsyncSession):
     """
@@ -173,16 +768,11 @@ async def publish_scheduled_blogs(db: AsyncSession):
     # But let's assume the server and db are aligned or use naive if unsure.
     # Best practice: use func.now() from DB, but easier to just check in python if logic is complex.
     # Simple query: UPDATE blogs SET status='published' WHERE status='scheduled' AND scheduled_at <= NOW()
-    
-    from sqlalchemy import update
-    
-    stmt = (
-        update(Blog)
-        .where(Blog.status == BlogStatus.scheduled)
-        .where(Blog.scheduled_at <= func.now())
-        .values(status=BlogStatus.published)
-    )
-    
-    await db.execute(stmt)
+    result = await db.execute(publish_due_statement())
+    published = result.all()
+    await _adjust_tag_counts(db, Counter(tag for _, tags in published for tag in set(tags or [])))
     await db.commit()
+    if published:
+        await cache.invalidate(cache.LIST_TAG, *(cache.blog_tag(blog_id) for blog_id, _ in published))
+    return [blog_id for blog_id, _ in published]
 
@@ -0,0 +1,327 @@
+import asyncio
+import csv
+import enum
+import io
+import json
+import logging
+import os
+import re
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import select, func, DateTime, Integer, Float
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.blog import Blog, BlogStatus
+from app.models.comment import Comment
+from app.models.like import Like
+from app.models.user import User
+from app.utils.leader import NODE_ID
+
+logger = logging.getLogger(__name__)
+
+# matching fields from previous google sheets export
+CSV_HEADER = ["ID", "Title", "Description", "Content", "Author", "Created At", "Status"]
+
+def blog_export_query(
+    status: Optional[BlogStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    author: Optional[str] = None
+):
+    # Authors are joined in the same query and content is truncated in SQL,
+    # so each row is a plain tuple and nothing is lazy loaded per blog
+    query = (
+        select(
+            Blog.id,
+            Blog.title,
+            Blog.description,
+            func.left(Blog.content, 100), # Truncated content
+            User.username,
+            Blog.created_at,
+            Blog.status
+        )
+        .join(User, User.id == Blog.author_id)
+        .order_by(Blog.id)
+    )
+    if status:
+        query = query.where(Blog.status == status)
+    if created_from:
+        query = query.where(Blog.created_at >= created_from)
+    if created_to:
+        query = query.where(Blog.created_at < created_to)
+    if author:
+        query = query.where(User.username == author)
+    return query
+
+async def stream_blogs_csv(
+    status: Optional[BlogStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    author: Optional[str] = None,
+    gzip: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Yields the blogs CSV in chunks of about EXPORT_CHUNK_BYTES.
+    Rows are read through a server-side cursor EXPORT_BATCH_SIZE at a time, so memory
+    stays constant however large the table is. With gzip=True the chunks form a gzip stream.
+    Uses its own session because the response body is produced after the request
+    dependencies have been torn down.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(wbits=31) if gzip else None # wbits=31 -> gzip container
+
+    def take() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow(CSV_HEADER)
+    query = blog_export_query(status, created_from, created_to, author)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            for id, title, description, content, author_name, created_at, blog_status in rows:
+                writer.writerow([id, title, description, content, author_name, created_at, blog_status.value])
+                if buffer.tell() >= settings.EXPORT_CHUNK_BYTES:
+                    chunk = take()
+                    if chunk:
+                        yield chunk
+
+    chunk = take()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+# --- Background export jobs ---
+#
+# A job dumps a whole table (blogs, comments or likes) to a file under EXPORT_DIR:
+#   <id>.json            job state (status, progress), rewritten after every batch
+#   <id>.<ext>.part      artifact while it is being written
+#   <id>.<ext>           finished artifact
+# State lives on disk rather than in memory so any worker on the node can report
+# progress and serve the download, whichever worker runs the job.
+# cleanup_jobs() (at startup and on every new job) fails the jobs of workers that are
+# gone and removes finished jobs after EXPORT_RETENTION_HOURS.
+
+EXPORT_ENTITIES = {
+    "blogs": Blog,
+    "comments": Comment,
+    "likes": Like,
+}
+
+EXPORT_EXTENSIONS = {
+    "ndjson": "ndjson",
+    "parquet": "parquet",
+}
+
+# Keeps running tasks referenced until they finish
+_running_jobs = set()
+
+class ExportFormatUnavailable(Exception):
+    """Raised when the requested format needs an optional dependency that is missing."""
+
+def _export_dir() -> Path:
+    path = Path(settings.EXPORT_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _job_path(job_id: str) -> Path:
+    return _export_dir() / f"{job_id}.json"
+
+def artifact_path(job: dict) -> Path:
+    return _export_dir() / f"{job['id']}.{EXPORT_EXTENSIONS[job['format']]}"
+
+def _save_job(job: dict):
+    # Write-then-rename so readers never see a half-written state file
+    path = _job_path(job["id"])
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(job, default=_json_default))
+    os.replace(tmp, path)
+
+def _owner_alive(job: dict) -> bool:
+    # node_id is the NODE_ID ("host:pid") of the worker running the job
+    host, _, pid = (job.get("node_id") or "").rpartition(":")
+    if host != NODE_ID.rpartition(":")[0]:
+        return bool(host) # Another node's job (shared EXPORT_DIR), not ours to judge
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def cleanup_jobs():
+    """
+    Marks queued/running jobs whose worker no longer exists as failed and deletes their
+    partial files, then removes jobs finished more than EXPORT_RETENTION_HOURS ago with
+    their artifacts. Blocking, run it in a thread.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    for job in list_jobs():
+        path = artifact_path(job)
+        if job["status"] in ("queued", "running"):
+            if _owner_alive(job):
+                continue
+            logger.warning("Export %s was interrupted, marking it failed", job["id"])
+            path.with_name(path.name + ".part").unlink(missing_ok=True)
+            job["status"] = "failed"
+            job["error"] = "Interrupted: the worker running it stopped"
+            job["finished_at"] = now
+            _save_job(job)
+        elif job["finished_at"] and datetime.fromisoformat(job["finished_at"]) < cutoff:
+            path.unlink(missing_ok=True)
+            _job_path(job["id"]).unlink(missing_ok=True)
+
+def get_job(job_id: str) -> Optional[dict]:
+    if not re.fullmatch(r"[0-9a-f]{32}", job_id):
+        return None
+    path = _job_path(job_id)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+def list_jobs() -> List[dict]:
+    jobs = []
+    for path in _export_dir().glob("*.json"):
+        try:
+            jobs.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _arrow_schema(model):
+    import pyarrow as pa
+
+    def arrow_type(column_type):
+        if isinstance(column_type, ARRAY):
+            return pa.list_(arrow_type(column_type.item_type))
+        if isinstance(column_type, DateTime):
+            return pa.timestamp("us", tz="UTC")
+        if isinstance(column_type, Integer):
+            return pa.int64()
+        if isinstance(column_type, Float):
+            return pa.float64()
+        return pa.string() # String, Text, Enum
+
+    return pa.schema([
+        (column.name, arrow_type(column.type))
+        for column in model.__table__.columns
+        if not isinstance(column.type, TSVECTOR)
+    ])
+
+async def submit_export(entity: str, format: str, created_by: Optional[str] = None) -> dict:
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportFormatUnavailable("Parquet exports require the pyarrow package")
+
+    job = {
+        "id": uuid.uuid4().hex,
+        "entity": entity,
+        "format": format,
+        "status": "queued",
+        "rows_total": None,
+        "rows_written": 0,
+        "progress": None,
+        "file_size": None,
+        "error": None,
+        "created_by": created_by,
+        "created_at": datetime.now(timezone.utc),
+        "finished_at": None,
+        "node_id": NODE_ID,
+    }
+    await asyncio.to_thread(cleanup_jobs)
+    await asyncio.to_thread(_save_job, job)
+    task = asyncio.create_task(_run_export(job))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+    return json.loads(json.dumps(job, default=_json_default))
+
+async def _run_export(job: dict):
+    model = EXPORT_ENTITIES[job["entity"]]
+    columns = [
+        column for column in model.__table__.columns
+        if not isinstance(column.type, TSVECTOR)
+    ]
+    final_path = artifact_path(job)
+    part_path = final_path.with_name(final_path.name + ".part")
+
+    job["status"] = "running"
+    await asyncio.to_thread(_save_job, job)
+
+    writer = None
+    try:
+        async with AsyncSessionLocal() as db:
+            job["rows_total"] = await db.scalar(select(func.count()).select_from(model.__table__))
+            await asyncio.to_thread(_save_job, job)
+
+            if job["format"] == "parquet":
+                import pyarrow.parquet as pq
+                schema = _arrow_schema(model)
+                writer = await asyncio.to_thread(pq.ParquetWriter, part_path, schema)
+            else:
+                writer = await asyncio.to_thread(open, part_path, "w", encoding="utf-8")
+
+            query = (
+                select(*columns)
+                .order_by(model.__table__.c.id)
+                .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+            )
+            result = await db.stream(query)
+            async for rows in result.partitions():
+                batch = [row._asdict() for row in rows]
+                if job["format"] == "parquet":
+                    await asyncio.to_thread(_write_parquet_batch, writer, schema, batch)
+                else:
+                    await asyncio.to_thread(_write_ndjson_batch, writer, batch)
+                job["rows_written"] += len(batch)
+                if job["rows_total"]:
+                    job["progress"] = min(job["rows_written"] / job["rows_total"], 1.0)
+                await asyncio.to_thread(_save_job, job)
+
+        await asyncio.to_thread(writer.close)
+        writer = None
+        os.replace(part_path, final_path)
+        job["status"] = "completed"
+        job["progress"] = 1.0
+        job["file_size"] = final_path.stat().st_size
+    except Exception as e:
+        logger.exception("Export %s failed", job["id"])
+        job["status"] = "failed"
+        job["error"] = f"{type(e).__name__}: {e}"
+        if writer is not None:
+            await asyncio.to_thread(writer.close)
+        part_path.unlink(missing_ok=True)
+    finally:
+        job["finished_at"] = datetime.now(timezone.utc)
+        await asyncio.to_thread(_save_job, job)
+
+def _write_ndjson_batch(file, batch: List[dict]):
+    file.write("".join(json.dumps(row, default=_json_default) + "\n" for row in batch))
+
+def _write_parquet_batch(writer, schema, batch: List[dict]):
+    import pyarrow as pa
+    for row in batch:
+        for name, value in row.items():
+            if isinstance(value, enum.Enum):
+                row[name] = value.value
+    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
@@ -0,0 +1,216 @@
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import select, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.core import cache
+from app.models.blog import Blog, BlogStatus
+from app.models.user import User
+from app.schemas.blog import BlogImportRow
+from app.services.blog_service import _adjust_tag_counts, _published_tags, _notify_schedule, summarize_content
+
+logger = logging.getLogger(__name__)
+
+# Bulk blog import from NDJSON (one BlogImportRow per line).
+#
+# Rows are validated one by one and written in batches of IMPORT_BATCH_SIZE with a
+# single COPY. A row that fails validation or names an unknown author is reported
+# and skipped, the rest of its batch still goes in. If COPY itself fails the batch
+# is retried row by row under savepoints to find the offending rows.
+# Side effects of create_blog are applied once per batch (tag_stats) or once per
+# import (list cache invalidation, publisher wakeup) instead of per row.
+
+COPY_COLUMNS = [
+    "title", "description", "content", "cover_image", "tags", "status",
+    "scheduled_at", "author_id", "created_at", "updated_at", "excerpt", "reading_time",
+]
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, line: int, message: str):
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        return {"imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    # Splits a byte stream (e.g. request.stream()) into lines
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Naive timestamps in the file are taken as UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class _AuthorResolver:
+    # Maps author_id / author username to a user id, with one query per batch for unseen authors
+
+    def __init__(self, db: AsyncSession, default_author_id: Optional[int]):
+        self.db = db
+        self.default_author_id = default_author_id
+        self.ids_by_username: Dict[str, Optional[int]] = {}
+        self.known_ids: Dict[int, bool] = {}
+
+    async def load(self, rows: List[BlogImportRow]):
+        usernames = {row.author for row in rows if row.author_id is None and row.author} - self.ids_by_username.keys()
+        if usernames:
+            result = await self.db.execute(select(User.username, User.id).where(User.username.in_(usernames)))
+            found = dict(result.all())
+            for username in usernames:
+                self.ids_by_username[username] = found.get(username)
+
+        ids = {row.author_id for row in rows if row.author_id is not None} - self.known_ids.keys()
+        if ids:
+            result = await self.db.execute(select(User.id).where(User.id.in_(ids)))
+            found = set(result.scalars().all())
+            for user_id in ids:
+                self.known_ids[user_id] = user_id in found
+
+    def resolve(self, row: BlogImportRow) -> Optional[int]:
+        if row.author_id is not None:
+            return row.author_id if self.known_ids.get(row.author_id) else None
+        if row.author:
+            return self.ids_by_username.get(row.author)
+        return self.default_author_id
+
+async def _copy_blogs(db: AsyncSession, records: List[tuple]):
+    conn = await db.connection()
+    # asyncpg only opens the transaction on the first statement, make sure COPY runs inside it
+    await conn.execute(text("SELECT 1"))
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table("blogs", records=records, columns=COPY_COLUMNS)
+
+async def _insert_one_by_one(db: AsyncSession, batch: List[Tuple[int, BlogImportRow, tuple]], report: ImportReport):
+    inserted = []
+    for line, row, record in batch:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(Blog.__table__).values(dict(zip(COPY_COLUMNS, record))))
+            inserted.append((line, row, record))
+        except Exception as e:
+            report.error(line, f"{type(e).__name__}: {e}")
+    return inserted
+
+async def _import_batch(
+    db: AsyncSession,
+    batch: List[Tuple[int, BlogImportRow]],
+    authors: _AuthorResolver,
+    report: ImportReport
+) -> List[BlogImportRow]:
+    await authors.load([row for _, row in batch])
+    now = datetime.now(timezone.utc)
+
+    prepared = []
+    for line, row in batch:
+        author_id = authors.resolve(row)
+        if author_id is None:
+            report.error(line, "Unknown author" if (row.author_id is not None or row.author) else "No author given")
+            continue
+        # Same rule as create_blog
+        status = row.status
+        scheduled_at = _utc(row.scheduled_at)
+        if scheduled_at and scheduled_at > now:
+            status = BlogStatus.scheduled
+        record = (
+            row.title, row.description, row.content, row.cover_image, row.tags,
+            status.name, scheduled_at, author_id, _utc(row.created_at) or now, now,
+            *summarize_content(row.content),
+        )
+        row.status = status
+        prepared.append((line, row, record))
+
+    if not prepared:
+        return []
+
+    try:
+        await _copy_blogs(db, [record for _, _, record in prepared])
+        inserted = prepared
+    except Exception as e:
+        logger.warning("Import batch COPY failed (%s), retrying row by row", e)
+        await db.rollback()
+        inserted = await _insert_one_by_one(db, prepared, report)
+
+    tag_deltas = Counter()
+    for _, row, _ in inserted:
+        tag_deltas.update(_published_tags(row.status, row.tags))
+    await _adjust_tag_counts(db, tag_deltas)
+    await db.commit()
+
+    report.imported += len(inserted)
+    return [row for _, row, _ in inserted]
+
+async def import_blogs(
+    db: AsyncSession,
+    lines: AsyncIterable[Union[bytes, str]],
+    default_author_id: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    on_batch: Optional[Callable[[ImportReport], None]] = None
+) -> dict:
+    """
+    Imports NDJSON blog rows and returns {"imported", "failed", "errors"}.
+    Rows without author_id/author are attributed to default_author_id.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    report = ImportReport()
+    authors = _AuthorResolver(db, default_author_id)
+    any_published = False
+    earliest_schedule: Optional[datetime] = None
+
+    async def flush(batch):
+        nonlocal any_published, earliest_schedule
+        for row in await _import_batch(db, batch, authors, report):
+            if row.status == BlogStatus.published:
+                any_published = True
+            elif row.status == BlogStatus.scheduled and row.scheduled_at:
+                scheduled_at = _utc(row.scheduled_at)
+                if earliest_schedule is None or scheduled_at < earliest_schedule:
+                    earliest_schedule = scheduled_at
+        if on_batch:
+            on_batch(report)
+
+    batch: List[Tuple[int, BlogImportRow]] = []
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = BlogImportRow.model_validate_json(line)
+        except ValidationError as e:
+            report.error(line_number, _validation_message(e))
+            continue
+        batch.append((line_number, row))
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    if any_published:
+        await cache.invalidate(cache.LIST_TAG)
+    if earliest_schedule is not None:
+        _notify_schedule(earliest_schedule)
+    return report.as_dict()
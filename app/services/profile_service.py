@@ -0,0 +1,82 @@
+import json
+import os
+import pstats
+import re
+from cProfile import Profile
+from pathlib import Path
+from typing import List, Optional, Tuple
+from app.config import settings
+
+# Request profiles captured by ProfilingMiddleware (app/core/profiling.py), under PROFILE_DIR:
+#   <id>.json   summary: request, timings, SQL statements, top functions
+#   <id>.prof   full cProfile stats (python -m pstats, snakeviz, ...)
+# Only the newest PROFILE_MAX_KEPT profiles are kept.
+
+TOP_FUNCTIONS = 50
+
+def _profile_dir() -> Path:
+    path = Path(settings.PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _valid_id(profile_id: str) -> bool:
+    return re.fullmatch(r"[0-9a-f]{32}", profile_id) is not None
+
+def stats_path(profile_id: str) -> Path:
+    return _profile_dir() / f"{profile_id}.prof"
+
+def _top_functions(profiler: Profile) -> List[dict]:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{name} ({filename}:{line})" if line else name,
+            "calls": calls,
+            "total_ms": total * 1000,
+            "cumulative_ms": cumulative * 1000,
+        })
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+def save_profile(profile: dict, profiler: Profile, statements: List[Tuple[str, float]]):
+    """
+    Writes the summary and pstats files of one profiled request. Blocking, run it in a thread.
+    """
+    directory = _profile_dir()
+    profile["sql_count"] = len(statements)
+    profile["sql_ms"] = sum(elapsed for _, elapsed in statements) * 1000
+    profile["statements"] = [
+        {"sql": " ".join(statement.split()), "duration_ms": elapsed * 1000}
+        for statement, elapsed in statements
+    ]
+    profile["top_functions"] = _top_functions(profiler)
+    profiler.dump_stats(directory / f"{profile['id']}.prof")
+
+    path = directory / f"{profile['id']}.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(profile))
+    os.replace(tmp, path)
+    _prune(directory)
+
+def _prune(directory: Path):
+    summaries = sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in summaries[settings.PROFILE_MAX_KEPT:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".prof").unlink(missing_ok=True)
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    if not _valid_id(profile_id):
+        return None
+    path = _profile_dir() / f"{profile_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+def list_profiles() -> List[dict]:
+    profiles = []
+    for path in _profile_dir().glob("*.json"):
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
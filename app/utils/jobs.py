@@ -0,0 +1,80 @@
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core import metrics
+from app.database import AsyncSessionLocal
+from app.models.job import BackgroundJob
+from app.utils.leader import NODE_ID
+
+logger = logging.getLogger(__name__)
+
+# In-process stats for jobs run by this worker: name -> summary dict.
+# The same summary is persisted to background_jobs so any worker can report it.
+job_stats: Dict[str, dict] = {}
+
+async def run_job(name: str, fn: Callable[[], Awaitable[None]], due_at: Optional[datetime] = None):
+    """
+    Runs one background job, recording its duration and lag (start time minus the
+    time it was due). Errors are logged and recorded, never raised to the scheduler.
+    """
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    error = None
+    try:
+        await fn()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        logger.exception("Error in job %s", name)
+    duration_ms = (time.perf_counter() - start) * 1000
+    metrics.JOB_DURATION.labels(job=name, status="failed" if error else "ok").observe(duration_ms / 1000)
+    lag_ms = (started_at - due_at).total_seconds() * 1000 if due_at else None
+
+    stats = job_stats.setdefault(name, {"runs": 0, "failures": 0, "max_lag_ms": None})
+    stats["runs"] += 1
+    stats["failures"] += 1 if error else 0
+    stats["last_started_at"] = started_at
+    stats["last_duration_ms"] = duration_ms
+    stats["last_lag_ms"] = lag_ms
+    if lag_ms is not None:
+        stats["max_lag_ms"] = max(stats["max_lag_ms"] or 0, lag_ms)
+    stats["last_error"] = error
+
+    try:
+        await _persist(name, started_at, duration_ms, lag_ms, error)
+    except Exception as e:
+        logger.warning("Could not record run of job %s: %s", name, e)
+
+async def _persist(name: str, started_at: datetime, duration_ms: float, lag_ms: Optional[float], error: Optional[str]):
+    values = {
+        "name": name,
+        "node_id": NODE_ID,
+        "last_started_at": started_at,
+        "last_finished_at": datetime.now(timezone.utc),
+        "last_duration_ms": duration_ms,
+        "last_lag_ms": lag_ms,
+        "max_lag_ms": lag_ms,
+        "runs": 1,
+        "failures": 1 if error else 0,
+        "last_error": error,
+    }
+    stmt = pg_insert(BackgroundJob).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[BackgroundJob.name],
+        set_={
+            "node_id": stmt.excluded.node_id,
+            "last_started_at": stmt.excluded.last_started_at,
+            "last_finished_at": stmt.excluded.last_finished_at,
+            "last_duration_ms": stmt.excluded.last_duration_ms,
+            "last_lag_ms": stmt.excluded.last_lag_ms,
+            "max_lag_ms": func.greatest(BackgroundJob.max_lag_ms, stmt.excluded.max_lag_ms),
+            "runs": BackgroundJob.runs + 1,
+            "failures": BackgroundJob.failures + stmt.excluded.failures,
+            "last_error": stmt.excluded.last_error,
+        }
+    )
+    async with AsyncSessionLocal() as db:
+        await db.execute(stmt)
+        await db.commit()
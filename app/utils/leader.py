@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaderElector:
+    """
+    Elects a single process (across all workers and nodes sharing the database)
+    to run background jobs, using a session-level Postgres advisory lock.
+
+    The lock is held on a dedicated connection for as long as this process leads.
+    The leader checks that connection every LEADER_HEARTBEAT_SECONDS and steps down
+    if it is lost. If a leader dies its connection closes, Postgres drops the lock,
+    and the next follower to retry takes over (failover within one heartbeat).
+    Requires a session-pooled connection (not a transaction-mode pgbouncer).
+    """
+
+    def __init__(
+        self,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        lock_id: int = settings.LEADER_LOCK_ID,
+        heartbeat_seconds: float = settings.LEADER_HEARTBEAT_SECONDS
+    ):
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.lock_id = lock_id
+        self.heartbeat_seconds = heartbeat_seconds
+        self.is_leader = False
+        self._conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _try_acquire(self) -> bool:
+        conn = await engine.connect()
+        try:
+            acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(:id)"), {"id": self.lock_id})
+            # Don't keep a transaction open for the whole leadership
+            await conn.commit()
+        except Exception:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    async def _heartbeat(self) -> bool:
+        try:
+            await asyncio.wait_for(self._conn.execute(text("SELECT 1")), timeout=self.heartbeat_seconds)
+            await self._conn.commit()
+            return True
+        except Exception as e:
+            logger.warning("Leader heartbeat failed on %s: %s", NODE_ID, e)
+            return False
+
+    async def _release(self):
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": self.lock_id})
+            await conn.commit()
+            await conn.close()
+        except Exception:
+            # Connection is gone, and with it the lock; make sure the pool drops it
+            await conn.invalidate()
+
+    async def _step_down(self):
+        self.is_leader = False
+        await self._release()
+        try:
+            await self.on_demoted()
+        except Exception as e:
+            logger.exception("Error stopping background jobs on %s", NODE_ID)
+
+    async def run(self):
+        while True:
+            try:
+                if not self.is_leader:
+                    if await self._try_acquire():
+                        self.is_leader = True
+                        logger.info("%s elected leader for background jobs", NODE_ID)
+                        await self.on_elected()
+                elif not await self._heartbeat():
+                    logger.warning("%s lost leadership", NODE_ID)
+                    await self._step_down()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Leader election error on %s: %s", NODE_ID, e)
+                if self.is_leader:
+                    await self._step_down()
+            await asyncio.sleep(self.heartbeat_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            await self._step_down()
@@ -1,42 +1,206 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.events import EVENT_JOB_SUBMITTED
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
+from app.config import settings
+from app.core.events import hub
 from app.database import AsyncSessionLocal
 from app.models.blog import Blog, BlogStatus
+from app.services import blog_service, analytics_service
+from app.utils.jobs import run_job
+from app.utils.leader import LeaderElector
 from datetime import datetime, timezone
+from typing import Optional
 import asyncio
+import heapq
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
 async def check_scheduled_blogs():
-    print("Checking for scheduled blogs...")
+    logger.debug("Checking for scheduled blogs")
     async with AsyncSessionLocal() as db:
-        try:
-            now = datetime.now(timezone.utc)
-            # Find blogs that are scheduled and time has passed
+        published_ids = await blog_service.publish_scheduled_blogs(db)
+        for blog_id in published_ids:
+            logger.info("Published scheduled blog %s", blog_id)
+
+
+class ScheduledPublisher:
+    """
+    Publishes scheduled blogs at their scheduled_at instead of polling every minute.
+
+    Keeps a min-heap of upcoming scheduled_at times (loaded with one indexed query),
+    sleeps until the earliest one is due and then publishes everything due in a single
+    UPDATE ... RETURNING. create_blog/update_blog call notify() so a new or moved
+    schedule re-arms the sleep right away; on other workers notify() forwards the time
+    to the leader over the event hub. The heap is also reloaded every
+    SCHEDULER_RELOAD_SECONDS in case a notification was lost.
+    """
+
+    def __init__(self, lookahead: int = 1000):
+        self.lookahead = lookahead
+        self._heap = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._reload_now = False
+
+    async def load(self):
+        async with AsyncSessionLocal() as db:
             result = await db.execute(
-                select(Blog)
-                .where(
-                    Blog.status == BlogStatus.scheduled,
-                    Blog.scheduled_at <= now
-                )
+                select(Blog.scheduled_at)
+                .where(Blog.status == BlogStatus.scheduled, Blog.scheduled_at.is_not(None))
+                .order_by(Blog.scheduled_at)
+                .limit(self.lookahead)
             )
-            blogs_to_publish = result.scalars().all()
-            
-            if not blogs_to_publish:
-                return
-
-            for blog in blogs_to_publish:
-                print(f"Publishing blog {blog.id}")
-                blog.status = BlogStatus.published
-                db.add(blog)
-                
-            await db.commit()
-                    
-        except Exception as e:
-            print(f"Error in scheduler: {e}")
-            await db.rollback()
+            self._heap = [scheduled_at.timestamp() for scheduled_at in result.scalars().all()]
+        heapq.heapify(self._heap)
+
+    def notify(self, scheduled_at: Optional[datetime]):
+        # Called after a schedule is created or changed.
+        # Only the leader runs the publisher, the other workers pass the time on to it.
+        if scheduled_at is None:
+            return
+        if scheduled_at.tzinfo is None:
+            scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
+        if self._task is None:
+            hub.broadcast(SCHEDULE_CHANGED, {"scheduled_at": scheduled_at.isoformat()})
+            return
+        heapq.heappush(self._heap, scheduled_at.timestamp())
+        self._wakeup.set()
+
+    def _on_schedule_changed(self, data: Optional[dict]):
+        # Forwarded notify() from another worker, or None when some may have been missed
+        if self._task is None:
+            return
+        if data is None:
+            self._reload_now = True
+            self._wakeup.set()
+        else:
+            self.notify(datetime.fromisoformat(data["scheduled_at"]))
+
+    async def _sleep(self, timeout: float):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self):
+        # The first load happens in the loop too, so a database error at startup is retried
+        next_reload = 0.0
+        while True:
+            try:
+                now = time.time()
+                if self._heap and self._heap[0] <= now:
+                    due_at = datetime.fromtimestamp(self._heap[0], timezone.utc)
+                    while self._heap and self._heap[0] <= now:
+                        heapq.heappop(self._heap)
+                    await run_job("publish_scheduled_blogs", check_scheduled_blogs, due_at=due_at)
+                    await self.load()
+                    next_reload = time.time() + settings.SCHEDULER_RELOAD_SECONDS
+                    # Anything still due here lost a race with the database clock, retry shortly
+                    if self._heap and self._heap[0] <= time.time():
+                        await self._sleep(1)
+                    continue
+
+                if now >= next_reload or self._reload_now:
+                    self._reload_now = False
+                    await self.load()
+                    next_reload = now + settings.SCHEDULER_RELOAD_SECONDS
+                    continue
+
+                timeout = next_reload - now
+                if self._heap:
+                    timeout = min(timeout, self._heap[0] - now)
+                await self._sleep(timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Error in scheduled publisher")
+                await asyncio.sleep(5)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+SCHEDULE_CHANGED = "schedule_changed"
+
+publisher = ScheduledPublisher()
+hub.on(SCHEDULE_CHANGED, publisher._on_schedule_changed)
+
+async def reconcile_counters():
+    # Repairs drift in the denormalized likes/comments counters and tag_stats
+    async with AsyncSessionLocal() as db:
+        fixed = await blog_service.reconcile_engagement_counters(db)
+        if fixed:
+            logger.info("Reconciled engagement counters for %s blogs", fixed)
+        await blog_service.reconcile_tag_stats(db)
+
+async def refresh_analytics():
+    async with AsyncSessionLocal() as db:
+        await analytics_service.refresh_rollups(db)
+
+async def rebuild_analytics():
+    # Incremental refreshes miss deletes in older buckets, this catches them up
+    async with AsyncSessionLocal() as db:
+        buckets = await analytics_service.refresh_rollups(db, full=True)
+        logger.info("Rebuilt analytics rollups (%s hourly buckets)", buckets)
+
+# APScheduler job id -> the run time it was submitted for, used to report lag
+_submitted_for = {}
+
+def _on_job_submitted(event):
+    _submitted_for[event.job_id] = event.scheduled_run_times[-1]
+
+def _tracked(name: str, fn):
+    async def job():
+        await run_job(name, fn, due_at=_submitted_for.pop(name, None))
+    return job
+
+async def _start_jobs():
+    if not scheduler.running:
+        scheduler.add_listener(_on_job_submitted, EVENT_JOB_SUBMITTED)
+        scheduler.add_job(_tracked("reconcile_counters", reconcile_counters), 'interval', hours=1, id="reconcile_counters")
+        scheduler.add_job(
+            _tracked("refresh_analytics", refresh_analytics), 'interval',
+            seconds=settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS, id="refresh_analytics",
+            next_run_time=datetime.now(timezone.utc)
+        )
+        scheduler.add_job(_tracked("rebuild_analytics", rebuild_analytics), 'cron', hour=3, id="rebuild_analytics")
+        scheduler.start()
+    else:
+        scheduler.resume()
+    publisher.start()
+
+async def _stop_jobs():
+    if scheduler.running:
+        scheduler.pause()
+    await publisher.stop()
+
+# Every worker runs an elector, only the current leader runs the jobs above
+leader = LeaderElector(on_elected=_start_jobs, on_demoted=_stop_jobs)
 
 def start_scheduler():
-    scheduler.add_job(check_scheduled_blogs, 'interval', minutes=1)
-    scheduler.start()
+    if settings.LEADER_ELECTION_ENABLED:
+        leader.start()
+    else:
+        # Single-process deployments
+        asyncio.create_task(_start_jobs())
+
+async def stop_scheduler():
+    await leader.stop()
+    await publisher.stop()
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
@@ -0,0 +1,207 @@
+import asyncio
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from sqlalchemy import text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app.database import _create_engine
+from app.models.user import UserRole
+from app.services import blog_service
+from app.utils.pagination import encode_cursor
+
+# Query plan regression check.
+# Seeds a scratch database with a large data set, runs EXPLAIN on the queries the
+# hot endpoints build (blog list + count, blog detail, comment pages, is_liked
+# lookups, the scheduled publisher) and exits non-zero if any of them sequentially
+# scans blogs, comments or likes. Run it after adding a query or touching an index.
+#
+# The database must be empty and migrated; it is filled with throwaway rows:
+#
+#   DATABASE_URL=postgresql://.../plans alembic upgrade head
+#   python check_query_plans.py --database-url postgresql://.../plans
+#
+# Pass --reuse to skip seeding on later runs against the same database.
+#
+# It needs a real, seeded Postgres, so it is a script rather than part of tests/:
+# the unit tests (python -m pytest) run without a database and only check that
+# these statements build and compile (tests/test_query_builders.py), not their plans.
+
+LARGE_TABLES = {"blogs", "comments", "likes"}
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+    def __getattr__(self, name):
+        # The compiler reads DML flags (_inline, _returning, ...) off the top level statement
+        if name == "statement":
+            raise AttributeError(name)
+        return getattr(self.statement, name)
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+SEED = [
+    """
+    INSERT INTO users (username, email, password_hash, role, created_at)
+    SELECT 'plan_user_' || g, 'plan_user_' || g || '@example.com', 'x',
+           CASE WHEN g = 1 THEN 'admin'::userrole ELSE 'user'::userrole END,
+           now() - (g || ' minutes')::interval
+    FROM generate_series(1, :users) AS g
+    """,
+    # ~90% published, ~9% drafts, ~1% scheduled (mostly in the future)
+    """
+    INSERT INTO blogs (title, description, content, tags, status, scheduled_at, author_id,
+                       created_at, updated_at, excerpt, reading_time)
+    SELECT 'Blog ' || g, 'Description ' || g, repeat('lorem ipsum dolor sit amet ', 40),
+           ARRAY['tag' || (g % 50), 'tag' || (g % 7)],
+           CASE WHEN g % 100 = 0 THEN 'scheduled'::blogstatus
+                WHEN g % 11 = 0 THEN 'draft'::blogstatus
+                ELSE 'published'::blogstatus END,
+           CASE WHEN g % 100 = 0 THEN now() + ((g % 1000) - 10 || ' hours')::interval END,
+           (SELECT min(id) FROM users) + (g % :users),
+           now() - (g || ' seconds')::interval, now(), 'Excerpt ' || g, 1
+    FROM generate_series(1, :blogs) AS g
+    """,
+    """
+    INSERT INTO comments (content, blog_id, user_id, created_at)
+    SELECT 'Comment ' || g,
+           (SELECT min(id) FROM blogs) + (g % :blogs),
+           (SELECT min(id) FROM users) + (g % :users),
+           now() - (g || ' seconds')::interval
+    FROM generate_series(1, :comments) AS g
+    """,
+    # (blog, user) pairs stay unique as long as likes <= blogs * users
+    """
+    INSERT INTO likes (blog_id, user_id, created_at)
+    SELECT (SELECT min(id) FROM blogs) + (g % :blogs),
+           (SELECT min(id) FROM users) + ((g / :blogs) % :users),
+           now() - (g || ' seconds')::interval
+    FROM generate_series(0, :likes - 1) AS g
+    """,
+]
+
+async def seed(engine, args):
+    async with engine.begin() as conn:
+        if await conn.scalar(text("SELECT count(*) FROM blogs")):
+            sys.exit("blogs is not empty, point --database-url at a scratch database or pass --reuse")
+        params = {"users": args.users, "blogs": args.blogs, "comments": args.comments, "likes": args.likes}
+        for statement in SEED:
+            await conn.execute(text(statement), params)
+    # VACUUM can't run in a transaction; it also sets the visibility map for index-only scans
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE users, blogs, comments, likes"))
+
+def seq_scans(plan: dict) -> list:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+def node_types(plan: dict) -> list:
+    nodes = [f"{plan['Node Type']} on {plan['Relation Name']}" if "Relation Name" in plan else plan["Node Type"]]
+    for child in plan.get("Plans", []):
+        nodes.extend(node_types(child))
+    return nodes
+
+async def build_queries(conn) -> dict:
+    row = (await conn.execute(text(
+        "SELECT id, created_at FROM blogs WHERE status = 'published' ORDER BY created_at DESC, id DESC OFFSET 1000 LIMIT 1"
+    ))).one()
+    blog_id, created_at = row
+    cursor = encode_cursor(created_at, blog_id)
+    user_id = await conn.scalar(text("SELECT max(id) FROM users"))
+    liked = list((await conn.execute(text("SELECT id FROM blogs ORDER BY id DESC LIMIT 20"))).scalars())
+    comment = (await conn.execute(text(
+        "SELECT created_at, id FROM comments WHERE blog_id = :id ORDER BY created_at, id LIMIT 1"
+    ), {"id": blog_id})).first()
+
+    # Stand-ins for the authenticated user, the list/visibility builders only read id and role
+    user = SimpleNamespace(id=user_id, role=UserRole.user)
+    admin = SimpleNamespace(id=user_id, role=UserRole.admin)
+    limit = 20
+
+    queries = {
+        "read_blogs: first page": blog_service.blog_list_query(limit),
+        "read_blogs: cursor page": blog_service.blog_list_query(limit, cursor=cursor),
+        "read_blogs: summary view": blog_service.blog_list_query(limit, fields=blog_service.SUMMARY_FIELDS),
+        "read_blogs: tags (all)": blog_service.blog_list_query(limit, tags=["tag3", "tag4"]),
+        "read_blogs: tags (any)": blog_service.blog_list_query(limit, tags=["tag3", "tag4"], tag_match="any"),
+        "read_blogs: search": blog_service.blog_list_query(limit, search="lorem ipsum"),
+        "read_blogs: logged in": blog_service.blog_list_query(limit, current_user=user),
+        "read_blogs: admin": blog_service.blog_list_query(limit, current_user=admin),
+        "count: anonymous": blog_service.blog_count_query(),
+        "count: tags": blog_service.blog_count_query(tags=["tag3"]),
+        "count: logged in": blog_service.blog_count_query(current_user=user),
+        "get_blog: detail": blog_service.blog_detail_query(blog_id),
+        "get_blog: comments": blog_service.comment_page_query(blog_id, limit),
+        "is_liked lookup": blog_service.liked_blog_ids_query(user_id, liked),
+        "publish_scheduled_blogs": blog_service.publish_due_statement(),
+    }
+    if comment is not None:
+        queries["get_blog: comments cursor"] = blog_service.comment_page_query(
+            blog_id, limit, encode_cursor(comment.created_at, comment.id)
+        )
+    return queries
+
+async def check(engine, verbose: bool) -> bool:
+    ok = True
+    async with engine.connect() as conn:
+        queries = await build_queries(conn)
+        for name, query in queries.items():
+            plan = (await conn.scalar(Explain(query)))
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            root = plan[0]["Plan"]
+            scans = seq_scans(root)
+            status = "FAIL" if scans else "ok"
+            ok = ok and not scans
+            detail = f"seq scan on {', '.join(scans)}" if scans else f"cost {root['Total Cost']:.0f}"
+            print(f"{status:<5} {name:<30} {detail}")
+            if verbose or scans:
+                print("      " + " -> ".join(node_types(root)))
+        # Never leave anything behind from the statements themselves
+        await conn.rollback()
+    return ok
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("QUERY_PLAN_DATABASE_URL"))
+    parser.add_argument("--reuse", action="store_true", help="Skip seeding, the database is already filled")
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--blogs", type=int, default=200_000)
+    parser.add_argument("--comments", type=int, default=500_000)
+    parser.add_argument("--likes", type=int, default=500_000)
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not just failing ones")
+    args = parser.parse_args()
+
+    # Deliberately not DATABASE_URL: seeding writes hundreds of thousands of rows
+    if not args.database_url:
+        sys.exit("Pass --database-url (or QUERY_PLAN_DATABASE_URL) pointing at a scratch database")
+
+    engine = _create_engine(args.database_url)
+    try:
+        if not args.reuse:
+            started = datetime.now(timezone.utc)
+            await seed(engine, args)
+            print(f"Seeded in {(datetime.now(timezone.utc) - started).total_seconds():.0f}s")
+        ok = await check(engine, args.verbose)
+    finally:
+        await engine.dispose()
+
+    if not ok:
+        sys.exit(1)
+    print("No sequential scans on large tables")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+import os
+import shutil
+from prometheus_client import multiprocess
+
+# gunicorn -c gunicorn.conf.py -w 4 app.main:app
+# With PROMETHEUS_MULTIPROC_DIR set, /metrics adds up every worker (see app/core/metrics.py)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+
+def on_starting(server):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        # Left over files would be counted into this run
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Drops the worker's live gauges (requests in progress)
+        multiprocess.mark_process_dead(worker.pid)
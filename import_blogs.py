@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import sys
+import time
+from app.database import AsyncSessionLocal
+from app.models.user import User
+from sqlalchemy import select
+
+# Bulk import of blogs from an NDJSON file (one post per line, "-" for stdin).
+# Each line takes the fields of POST /api/blogs plus optional author / author_id
+# and created_at, e.g.
+#   {"title": "...", "content": "...", "tags": ["a", "b"], "status": "published",
+#    "author": "alice", "created_at": "2019-04-01T10:00:00Z"}
+#
+#   python import_blogs.py posts.ndjson --author admin
+
+async def read_lines(path: str):
+    file = sys.stdin.buffer if path == "-" else open(path, "rb")
+    with file:
+        for line in file:
+            yield line
+
+async def main(args):
+    from app.services import import_service
+
+    async with AsyncSessionLocal() as db:
+        default_author_id = None
+        if args.author:
+            default_author_id = await db.scalar(select(User.id).where(User.username == args.author))
+            if default_author_id is None:
+                print(f"User '{args.author}' not found.")
+                return 1
+
+        started = time.perf_counter()
+
+        def progress(report):
+            elapsed = time.perf_counter() - started
+            rate = report.imported / elapsed if elapsed else 0
+            print(f"imported {report.imported}, failed {report.failed} ({rate:.0f} rows/s)", flush=True)
+
+        result = await import_service.import_blogs(
+            db, read_lines(args.path),
+            default_author_id=default_author_id,
+            batch_size=args.batch_size,
+            on_batch=progress
+        )
+
+    for error in result["errors"]:
+        print(f"line {error['line']}: {error['error']}")
+    print(f"Done: {result['imported']} imported, {result['failed']} failed in {time.perf_counter() - started:.1f}s")
+    return 0 if not result["failed"] else 2
+
+if __name__ == "__main__":
+    # Ensure app modules are found
+    import os
+    sys.path.append(os.getcwd())
+
+    parser = argparse.ArgumentParser(description="Bulk import blogs from NDJSON")
+    parser.add_argument("path", help="NDJSON file, or - for stdin")
+    parser.add_argument("--author", help="Username for rows without author/author_id")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per COPY (default IMPORT_BATCH_SIZE)")
+    try:
+        sys.exit(asyncio.run(main(parser.parse_args())))
+    except KeyboardInterrupt:
+        print("\nOperation cancelled.")
@@ -0,0 +1,48 @@
+"""blog_excerpt_reading_time
+
+Revision ID: 04c11347e6d6
+Revises: b11c7ae32afc
+Create Date: 2026-10-17 16:40:52.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '04c11347e6d6'
+down_revision: Union[str, Sequence[str], None] = 'b11c7ae32afc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blogs', sa.Column('excerpt', sa.Text(), nullable=True))
+    op.add_column('blogs', sa.Column('reading_time', sa.Integer(), server_default='1', nullable=False))
+    # Same as blog_service.summarize_content: collapse whitespace, cut at the last
+    # space within 280 characters (no space in there: keep all 280),
+    # 200 words per minute
+    op.execute(r"""
+        UPDATE blogs SET
+            excerpt = CASE
+                WHEN length(body.text) > 280
+                THEN regexp_replace(left(body.text, 280), ' [^ ]*$', '') || '…'
+                ELSE body.text
+            END,
+            reading_time = GREATEST(1, ceil(
+                coalesce(array_length(regexp_split_to_array(nullif(body.text, ''), ' '), 1), 0) / 200.0
+            ))
+        FROM (
+            SELECT id, btrim(regexp_replace(content, '\s+', ' ', 'g')) AS text FROM blogs
+        ) AS body
+        WHERE body.id = blogs.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blogs', 'reading_time')
+    op.drop_column('blogs', 'excerpt')
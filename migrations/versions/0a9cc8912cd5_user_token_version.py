@@ -0,0 +1,28 @@
+"""user_token_version
+
+Revision ID: 0a9cc8912cd5
+Revises: bd1f3e64061c
+Create Date: 2026-10-17 11:26:05.771482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a9cc8912cd5'
+down_revision: Union[str, Sequence[str], None] = 'bd1f3e64061c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,69 @@
+"""analytics_rollups
+
+Revision ID: 322c3ba111ea
+Revises: 9bf8d17f4ebd
+Create Date: 2026-10-17 14:02:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '322c3ba111ea'
+down_revision: Union[str, Sequence[str], None] = '9bf8d17f4ebd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('likes', sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+    # Existing likes have no timestamp; use the earliest moment the like could have
+    # happened instead of piling them all into the hour of this migration
+    op.execute("""
+        UPDATE likes SET created_at = GREATEST(blogs.created_at, users.created_at)
+        FROM blogs, users
+        WHERE blogs.id = likes.blog_id AND users.id = likes.user_id
+    """)
+    op.execute("UPDATE likes SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('likes', 'created_at', nullable=False, server_default=sa.text('now()'))
+
+    # Range scans for the incremental rollup refresh
+    op.create_index(op.f('ix_users_created_at'), 'users', ['created_at'], unique=False)
+    op.create_index(op.f('ix_blogs_created_at'), 'blogs', ['created_at'], unique=False)
+    op.create_index(op.f('ix_blogs_updated_at'), 'blogs', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_comments_created_at'), 'comments', ['created_at'], unique=False)
+    op.create_index(op.f('ix_likes_created_at'), 'likes', ['created_at'], unique=False)
+
+    op.create_table('analytics_hourly',
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('new_users', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('new_blogs', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('published_blogs', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('draft_blogs', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('scheduled_blogs', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('new_comments', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('new_likes', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('bucket')
+    )
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # No watermark yet, so the first refresh does a full build
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rollup_watermarks')
+    op.drop_table('analytics_hourly')
+    op.drop_index(op.f('ix_likes_created_at'), table_name='likes')
+    op.drop_index(op.f('ix_comments_created_at'), table_name='comments')
+    op.drop_index(op.f('ix_blogs_updated_at'), table_name='blogs')
+    op.drop_index(op.f('ix_blogs_created_at'), table_name='blogs')
+    op.drop_index(op.f('ix_users_created_at'), table_name='users')
+    op.drop_column('likes', 'created_at')
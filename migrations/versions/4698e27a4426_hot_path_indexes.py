@@ -0,0 +1,41 @@
+"""hot_path_indexes
+
+Revision ID: 4698e27a4426
+Revises: b81bcd2edb74
+Create Date: 2026-10-17 18:02:47.519230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4698e27a4426'
+down_revision: Union[str, Sequence[str], None] = 'b81bcd2edb74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction, and keeps the tables writable while
+    # the indexes build. comments (blog_id, created_at, id) already exists (comment_thread_index).
+    with op.get_context().autocommit_block():
+        op.create_index('ix_blogs_status_created_at_id', 'blogs', ['status', 'created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(
+            'ix_blogs_scheduled_at_scheduled', 'blogs', ['scheduled_at'], unique=False,
+            postgresql_where=sa.text("status = 'scheduled'"), postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(op.f('ix_blogs_author_id'), 'blogs', ['author_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_likes_user_id_blog_id', 'likes', ['user_id', 'blog_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_likes_user_id_blog_id', table_name='likes', postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_blogs_author_id'), table_name='blogs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_blogs_scheduled_at_scheduled', table_name='blogs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_blogs_status_created_at_id', table_name='blogs', postgresql_concurrently=True, if_exists=True)
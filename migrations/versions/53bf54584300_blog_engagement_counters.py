@@ -0,0 +1,41 @@
+"""blog_engagement_counters
+
+Revision ID: 53bf54584300
+Revises: 3b28a5367f9b
+Create Date: 2026-10-17 09:12:40.318220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '53bf54584300'
+down_revision: Union[str, Sequence[str], None] = '3b28a5367f9b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blogs', sa.Column('likes_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('blogs', sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing rows
+    op.execute("""
+        UPDATE blogs SET
+            likes_count = COALESCE(l.n, 0),
+            comments_count = COALESCE(c.n, 0)
+        FROM blogs AS b
+        LEFT JOIN (SELECT blog_id, count(*) AS n FROM likes GROUP BY blog_id) AS l ON l.blog_id = b.id
+        LEFT JOIN (SELECT blog_id, count(*) AS n FROM comments GROUP BY blog_id) AS c ON c.blog_id = b.id
+        WHERE blogs.id = b.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blogs', 'comments_count')
+    op.drop_column('blogs', 'likes_count')
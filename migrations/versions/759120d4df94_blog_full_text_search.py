@@ -0,0 +1,59 @@
+"""blog_full_text_search
+
+Revision ID: 759120d4df94
+Revises: 53bf54584300
+Create Date: 2026-10-17 10:03:11.524907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '759120d4df94'
+down_revision: Union[str, Sequence[str], None] = '53bf54584300'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match SEARCH_CONFIG in app/services/blog_service.py
+SEARCH_VECTOR_EXPR = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(array_to_string({row}tags, ' '), '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}content, '')), 'C')
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blogs', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION blogs_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_EXPR.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER blogs_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, description, content, tags ON blogs
+        FOR EACH ROW EXECUTE FUNCTION blogs_search_vector_update()
+    """)
+
+    # Backfill existing rows
+    op.execute(f"UPDATE blogs SET search_vector = {SEARCH_VECTOR_EXPR.format(row='')}")
+
+    op.create_index('ix_blogs_search_vector', 'blogs', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blogs_search_vector', table_name='blogs', postgresql_using='gin')
+    op.execute("DROP TRIGGER IF EXISTS blogs_search_vector_trigger ON blogs")
+    op.execute("DROP FUNCTION IF EXISTS blogs_search_vector_update()")
+    op.drop_column('blogs', 'search_vector')
@@ -0,0 +1,35 @@
+"""fix_unbroken_excerpts
+
+Revision ID: 97f4c22232fc
+Revises: 4698e27a4426
+Create Date: 2026-10-17 19:12:06.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '97f4c22232fc'
+down_revision: Union[str, Sequence[str], None] = '4698e27a4426'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The first excerpt backfill (04c11347e6d6) cut everything when the first 280
+    # characters had no space, leaving just '…'. summarize_content never produces
+    # that, so these rows are exactly the ones to redo.
+    op.execute(r"""
+        UPDATE blogs SET excerpt = left(btrim(regexp_replace(content, '\s+', ' ', 'g')), 280) || '…'
+        WHERE excerpt = '…'
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Data fix only, nothing to undo
+    pass
@@ -0,0 +1,40 @@
+"""background_jobs
+
+Revision ID: 9bf8d17f4ebd
+Revises: 0a9cc8912cd5
+Create Date: 2026-10-17 12:14:52.660318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9bf8d17f4ebd'
+down_revision: Union[str, Sequence[str], None] = '0a9cc8912cd5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('background_jobs',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('node_id', sa.String(), nullable=True),
+    sa.Column('last_started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_duration_ms', sa.Float(), nullable=True),
+    sa.Column('last_lag_ms', sa.Float(), nullable=True),
+    sa.Column('max_lag_ms', sa.Float(), nullable=True),
+    sa.Column('runs', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('failures', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('background_jobs')
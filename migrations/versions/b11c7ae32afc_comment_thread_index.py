@@ -0,0 +1,28 @@
+"""comment_thread_index
+
+Revision ID: b11c7ae32afc
+Revises: 322c3ba111ea
+Create Date: 2026-10-17 15:21:09.482731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b11c7ae32afc'
+down_revision: Union[str, Sequence[str], None] = '322c3ba111ea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_comments_blog_id_created_at_id', 'comments', ['blog_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_blog_id_created_at_id', table_name='comments')
@@ -0,0 +1,29 @@
+"""blog_counters_updated_at
+
+Revision ID: b81bcd2edb74
+Revises: 04c11347e6d6
+Create Date: 2026-10-17 17:25:31.270448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81bcd2edb74'
+down_revision: Union[str, Sequence[str], None] = '04c11347e6d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL until the counters next change; Last-Modified falls back to updated_at
+    op.add_column('blogs', sa.Column('counters_updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blogs', 'counters_updated_at')
@@ -0,0 +1,44 @@
+"""tag_index_and_tag_stats
+
+Revision ID: bd1f3e64061c
+Revises: 759120d4df94
+Create Date: 2026-10-17 10:41:27.093615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bd1f3e64061c'
+down_revision: Union[str, Sequence[str], None] = '759120d4df94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_blogs_tags', 'blogs', ['tags'], unique=False, postgresql_using='gin')
+
+    op.create_table('tag_stats',
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('published_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('tag')
+    )
+
+    # Backfill from published blogs
+    op.execute("""
+        INSERT INTO tag_stats (tag, published_count)
+        SELECT t.tag, count(DISTINCT blogs.id)
+        FROM blogs, unnest(blogs.tags) AS t(tag)
+        WHERE blogs.status = 'published'
+        GROUP BY t.tag
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tag_stats')
+    op.drop_index('ix_blogs_tags', table_name='blogs', postgresql_using='gin')
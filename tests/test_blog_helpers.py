@@ -0,0 +1,35 @@
+import pytest
+from app.services.blog_service import (
+    EXCERPT_LENGTH, SUMMARY_FIELDS, WORDS_PER_MINUTE, parse_fields, summarize_content
+)
+
+
+def test_summarize_short_content():
+    assert summarize_content("  Hello\n\n  world  ") == ("Hello world", 1)
+    assert summarize_content("") == ("", 1)
+    assert summarize_content(None) == ("", 1)
+
+def test_summarize_drops_the_partial_word():
+    # 23 * 12 = 276 characters, the 280 cut lands inside the next "hello"
+    excerpt, _ = summarize_content("hello world " * 30)
+    assert excerpt == ("hello world " * 23).strip() + "…"
+
+def test_summarize_without_spaces_keeps_the_cut():
+    excerpt, _ = summarize_content("x" * (EXCERPT_LENGTH + 20))
+    assert excerpt == "x" * EXCERPT_LENGTH + "…"
+
+def test_reading_time():
+    assert summarize_content("word " * WORDS_PER_MINUTE)[1] == 1
+    assert summarize_content("word " * (WORDS_PER_MINUTE + 1))[1] == 2
+    assert summarize_content("word " * (WORDS_PER_MINUTE * 5))[1] == 5
+
+
+def test_parse_fields_always_includes_id():
+    assert parse_fields("title, tags,,") == {"id", "title", "tags"}
+
+def test_parse_fields_rejects_unknown_names():
+    with pytest.raises(ValueError, match="Unknown fields: nope, secret"):
+        parse_fields("title,secret,nope")
+
+def test_summary_fields_parse():
+    assert parse_fields(",".join(SUMMARY_FIELDS)) == SUMMARY_FIELDS | {"id"}
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import pytest
+from app.core import cache
+from app.core.events import hub
+from app.utils.leader import NODE_ID
+
+# Response cache invalidation across workers: invalidate() NOTIFYs the tags through
+# the event hub, the other workers drop the same entries (or everything).
+
+@pytest.fixture
+def backend():
+    previous = cache.get_response_cache()
+    backend = cache.LRUCache(max_entries=100, ttl_seconds=60)
+    cache.set_response_cache(backend)
+    yield backend
+    cache.set_response_cache(previous)
+
+@pytest.fixture
+def listening(monkeypatch):
+    # Pretend the listener runs so broadcast() queues payloads
+    monkeypatch.setattr(hub, "_task", object())
+    monkeypatch.setattr(hub, "_outbox", {})
+    return hub
+
+def fill(backend):
+    async def scenario():
+        await backend.set("list", b"l", [cache.LIST_TAG, cache.blog_tag(1)])
+        await backend.set("detail:1", b"1", [cache.blog_tag(1)])
+        await backend.set("detail:2", b"2", [cache.blog_tag(2)])
+    asyncio.run(scenario())
+
+def cached_keys(backend):
+    async def scenario():
+        return {key for key in ("list", "detail:1", "detail:2") if await backend.get(key) is not None}
+    return asyncio.run(scenario())
+
+def receive(payload: dict):
+    # What another worker's NOTIFY looks like when it arrives here
+    async def scenario():
+        hub._on_notify(None, 0, "blog_events", json.dumps({"origin": "elsewhere:1", **payload}))
+        await asyncio.gather(*hub._handler_tasks)
+    asyncio.run(scenario())
+
+
+def test_invalidate_broadcasts_tags(backend, listening):
+    fill(backend)
+    asyncio.run(cache.invalidate(cache.blog_tag(1)))
+    assert cached_keys(backend) == {"detail:2"}
+    [payload] = [json.loads(value) for value in listening._outbox.values()]
+    assert payload == {"origin": NODE_ID, "kind": cache.CACHE_INVALIDATED, "data": {"tags": ["blog:1"]}}
+
+def test_too_many_tags_broadcast_a_flush(backend, listening):
+    asyncio.run(cache.invalidate(*(cache.blog_tag(i) for i in range(cache.MAX_BROADCAST_TAGS + 1))))
+    [payload] = [json.loads(value) for value in listening._outbox.values()]
+    assert payload["data"] == {"tags": None}
+
+def test_remote_invalidation_drops_tagged_entries(backend):
+    fill(backend)
+    receive({"kind": cache.CACHE_INVALIDATED, "data": {"tags": [cache.blog_tag(2)]}})
+    assert cached_keys(backend) == {"list", "detail:1"}
+
+def test_remote_flush_and_reconnect_clear_everything(backend):
+    fill(backend)
+    receive({"kind": cache.CACHE_INVALIDATED, "data": {"tags": None}})
+    assert cached_keys(backend) == set()
+
+    fill(backend)
+    async def reconnect():
+        hub._resync_all()
+        await asyncio.gather(*hub._handler_tasks)
+    asyncio.run(reconnect())
+    assert cached_keys(backend) == set()
+
+def test_own_notifications_are_ignored(backend):
+    fill(backend)
+    receive({"origin": NODE_ID, "kind": cache.CACHE_INVALIDATED, "data": {"tags": None}})
+    assert cached_keys(backend) == {"list", "detail:1", "detail:2"}
@@ -0,0 +1,156 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+from app.core import cache
+from app.models.blog import Blog, BlogStatus
+from app.models.comment import Comment
+from app.models.user import User, UserRole
+from app.routers import blogs
+from app.services import blog_service
+from app.utils.pagination import decode_cursor
+
+# Comment pagination (blog detail and GET /blogs/{id}/comments) against a stand-in
+# session that answers each statement from canned rows, no database needed.
+
+START = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+AUTHOR = User(id=3, username="author", email="author@example.com", role=UserRole.user, created_at=START)
+
+def make_comments(count: int, blog_id: int = 1):
+    return [
+        Comment(id=i, blog_id=blog_id, user_id=AUTHOR.id, user=AUTHOR, content=f"comment {i}",
+                created_at=START + timedelta(minutes=i))
+        for i in range(1, count + 1)
+    ]
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+class FakeSession:
+    """Returns the canned rows for the entity a SELECT is for, honouring its LIMIT."""
+
+    def __init__(self, rows: dict, scalar=None):
+        self.rows = rows
+        self.scalar_value = scalar
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        entity = statement.column_descriptions[0]["entity"]
+        rows = self.rows.get(entity, [])
+        limit = getattr(statement, "_limit", None)
+        return Result(rows[:limit] if limit is not None else rows)
+
+    async def scalar(self, statement):
+        self.statements.append(statement)
+        return self.scalar_value
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.asyncpg.dialect(), compile_kwargs={"literal_binds": True}))
+
+def request() -> Request:
+    return Request({"type": "http", "method": "GET", "headers": []})
+
+def published_blog(comments_count: int) -> Blog:
+    return Blog(
+        id=1, title="t", description=None, content="c", cover_image=None, tags=["a", "b"],
+        status=BlogStatus.published, scheduled_at=None, author_id=AUTHOR.id, author=AUTHOR,
+        created_at=START, updated_at=START, counters_updated_at=None, updated_by=None,
+        excerpt="c", reading_time=1, likes_count=0, comments_count=comments_count,
+    )
+
+
+def test_get_comments_page_without_next_page():
+    db = FakeSession({Comment: make_comments(3)})
+    comments, next_cursor = asyncio.run(blog_service.get_comments_page(db, 1, 10))
+    assert [comment.id for comment in comments] == [1, 2, 3]
+    assert next_cursor is None
+
+def test_get_comments_page_cursor_points_at_last_returned_row():
+    db = FakeSession({Comment: make_comments(25)})
+    comments, next_cursor = asyncio.run(blog_service.get_comments_page(db, 1, 10))
+    # The extra (11th) row only tells there is more, it isn't returned
+    assert [comment.id for comment in comments] == list(range(1, 11))
+    assert decode_cursor(next_cursor) == (comments[-1].created_at, 10)
+
+def test_get_comments_page_exactly_limit_rows():
+    db = FakeSession({Comment: make_comments(10)})
+    comments, next_cursor = asyncio.run(blog_service.get_comments_page(db, 1, 10))
+    assert len(comments) == 10 and next_cursor is None
+
+def test_get_comments_page_compiled_query():
+    db = FakeSession({Comment: make_comments(11)})
+    _, next_cursor = asyncio.run(blog_service.get_comments_page(db, 1, 10))
+    first = compile_sql(db.statements[0])
+    assert "WHERE comments.blog_id = 1" in first
+    assert "ORDER BY comments.created_at, comments.id" in first
+    assert "LIMIT 11" in first
+
+    asyncio.run(blog_service.get_comments_page(db, 1, 10, next_cursor))
+    second = compile_sql(db.statements[1])
+    assert "(comments.created_at, comments.id) > (" in second
+    assert "LIMIT 11" in second
+
+
+def test_read_comments_pages_and_total():
+    db = FakeSession({Comment: make_comments(30)}, scalar=30)
+    page = asyncio.run(blogs.read_comments(1, db, current_user=SimpleNamespace(id=9, role=UserRole.user), limit=5))
+    assert page["total"] == 30 and page["limit"] == 5
+    assert [comment.id for comment in page["comments"]] == [1, 2, 3, 4, 5]
+    assert decode_cursor(page["next_cursor"])[1] == 5
+
+def test_read_comments_rejects_bad_cursor():
+    db = FakeSession({Comment: []}, scalar=3)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(blogs.read_comments(1, db, current_user=SimpleNamespace(id=9, role=UserRole.user), cursor="garbage"))
+    assert exc.value.status_code == 400
+
+def test_read_comments_unknown_blog():
+    db = FakeSession({}, scalar=None)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(blogs.read_comments(1, db, current_user=None))
+    assert exc.value.status_code == 404
+
+
+def test_detail_embeds_first_page_of_comments():
+    total = blogs.DETAIL_COMMENTS_LIMIT + 5
+    db = FakeSession({Blog: [published_blog(total)], Comment: make_comments(total)})
+    user = SimpleNamespace(id=9, role=UserRole.user)
+    blog = asyncio.run(blogs.get_blog(1, request(), Response(), db, current_user=user))
+    assert len(blog.comments_page) == blogs.DETAIL_COMMENTS_LIMIT
+    assert decode_cursor(blog.comments_next_cursor)[1] == blogs.DETAIL_COMMENTS_LIMIT
+
+def test_detail_anonymous_body_is_truncated():
+    async def scenario():
+        await cache.get_response_cache().clear()
+        total = blogs.DETAIL_COMMENTS_LIMIT + 1
+        db = FakeSession({Blog: [published_blog(total)], Comment: make_comments(total)})
+        try:
+            return await blogs.get_blog(1, request(), Response(), db, current_user=None)
+        finally:
+            await cache.get_response_cache().clear()
+
+    body = json.loads(asyncio.run(scenario()).body)
+    assert body["comments_count"] == blogs.DETAIL_COMMENTS_LIMIT + 1
+    assert len(body["comments"]) == blogs.DETAIL_COMMENTS_LIMIT
+    assert body["comments"][0]["user"]["username"] == "author" # Rendered by alias
+    assert body["comments_next_cursor"] is not None
+
+def test_detail_without_comments():
+    db = FakeSession({Blog: [published_blog(0)]})
+    blog = asyncio.run(blogs.get_blog(1, request(), Response(), db, current_user=SimpleNamespace(id=9, role=UserRole.user)))
+    assert blog.comments_page == [] and blog.comments_next_cursor is None
@@ -0,0 +1,47 @@
+import asyncio
+from app.config import settings
+from app.core.events import Subscription
+
+def drain(subscription: Subscription):
+    return asyncio.run(subscription.get())
+
+
+def test_events_in_order_with_latest_coalesced_last():
+    subscription = Subscription(1)
+    subscription.put("likes", {"likes_count": 1})
+    subscription.put("comment", {"id": 10})
+    subscription.put("likes", {"likes_count": 3})
+    subscription.put("comment_deleted", {"id": 10})
+    assert drain(subscription) == [
+        ("comment", {"id": 10}),
+        ("comment_deleted", {"id": 10}),
+        ("likes", {"likes_count": 3}),
+    ]
+    assert not subscription.ready.is_set()
+
+def test_get_waits_for_put():
+    async def scenario():
+        subscription = Subscription(1)
+        waiter = asyncio.ensure_future(subscription.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        subscription.put("comment", {"id": 1})
+        return await waiter
+    assert asyncio.run(scenario()) == [("comment", {"id": 1})]
+
+def test_overflow_becomes_a_single_resync():
+    subscription = Subscription(1)
+    for i in range(settings.EVENTS_QUEUE_SIZE + 5):
+        subscription.put("comment", {"id": i})
+    subscription.put("likes", {"likes_count": 2})
+    assert drain(subscription) == [("resync", {})]
+    # Back to normal afterwards
+    subscription.put("comment", {"id": 1})
+    assert drain(subscription) == [("comment", {"id": 1})]
+
+def test_resync_event_drops_queued_events():
+    subscription = Subscription(1)
+    subscription.put("comment", {"id": 1})
+    subscription.put("resync", {})
+    subscription.put("comment", {"id": 2})
+    assert drain(subscription) == [("resync", {})]
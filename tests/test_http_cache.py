@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from starlette.requests import Request
+from app.config import settings
+from app.core import http_cache
+
+MODIFIED = datetime(2026, 10, 17, 12, 30, 15, 250000, tzinfo=timezone.utc)
+HTTP_DATE = "Sat, 17 Oct 2026 12:30:15 GMT"
+
+def request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+def blog(id=1, likes=0, updated_at=MODIFIED, counters_updated_at=None):
+    return SimpleNamespace(id=id, updated_at=updated_at, counters_updated_at=counters_updated_at,
+                           likes_count=likes, comments_count=0)
+
+
+def test_no_validators():
+    assert not http_cache.is_not_modified(request(), 'W/"abc"', MODIFIED)
+
+def test_if_none_match_weak_comparison():
+    assert http_cache.is_not_modified(request(if_none_match='W/"abc"'), 'W/"abc"')
+    assert http_cache.is_not_modified(request(if_none_match='"abc"'), 'W/"abc"')
+    assert http_cache.is_not_modified(request(if_none_match='W/"abc"'), '"abc"')
+    assert not http_cache.is_not_modified(request(if_none_match='W/"abd"'), 'W/"abc"')
+
+def test_if_none_match_list_and_star():
+    assert http_cache.is_not_modified(request(if_none_match='"x", W/"abc" ,"y"'), 'W/"abc"')
+    assert http_cache.is_not_modified(request(if_none_match=" * "), 'W/"abc"')
+
+def test_if_modified_since_second_resolution():
+    # Last-Modified is sent without the microseconds, echoing it back must match
+    assert http_cache.is_not_modified(request(if_modified_since=HTTP_DATE), 'W/"abc"', MODIFIED)
+    assert http_cache.is_not_modified(request(if_modified_since=HTTP_DATE), 'W/"abc"', MODIFIED - timedelta(hours=1))
+    assert not http_cache.is_not_modified(request(if_modified_since=HTTP_DATE), 'W/"abc"', MODIFIED + timedelta(seconds=1))
+
+def test_if_modified_since_naive_and_invalid():
+    assert http_cache.is_not_modified(request(if_modified_since=HTTP_DATE), 'W/"abc"', MODIFIED.replace(tzinfo=None))
+    assert not http_cache.is_not_modified(request(if_modified_since="yesterday"), 'W/"abc"', MODIFIED)
+    # Without a Last-Modified there is nothing to compare against
+    assert not http_cache.is_not_modified(request(if_modified_since=HTTP_DATE), 'W/"abc"')
+
+def test_if_none_match_wins_over_if_modified_since():
+    stale_etag = request(if_none_match='W/"old"', if_modified_since=HTTP_DATE)
+    assert not http_cache.is_not_modified(stale_etag, 'W/"abc"', MODIFIED)
+    old_date = request(if_none_match='W/"abc"', if_modified_since="Thu, 01 Jan 2026 00:00:00 GMT")
+    assert http_cache.is_not_modified(old_date, 'W/"abc"', MODIFIED)
+
+
+def test_list_etag_changes_with_rows_viewer_and_extras():
+    page = [blog(1), blog(2)]
+    etag = http_cache.list_etag(page, None, 2, None)
+    assert etag.startswith('W/"')
+    assert etag == http_cache.list_etag([blog(1), blog(2)], None, 2, None)
+    assert etag != http_cache.list_etag([blog(1), blog(2, likes=1)], None, 2, None)
+    assert etag != http_cache.list_etag([blog(2), blog(1)], None, 2, None)
+    assert etag != http_cache.list_etag(page, SimpleNamespace(id=7), 2, None)
+    assert etag != http_cache.list_etag(page, None, 3, None)
+    assert etag != http_cache.list_etag(page, None, 2, "next")
+
+
+def test_cache_headers_public():
+    headers = http_cache.cache_headers('W/"abc"', MODIFIED)
+    assert headers["ETag"] == 'W/"abc"'
+    assert headers["Vary"] == "Authorization"
+    assert headers["Last-Modified"] == HTTP_DATE
+    assert headers["Cache-Control"] == f"public, max-age={settings.HTTP_PUBLIC_MAX_AGE_SECONDS}, must-revalidate"
+
+def test_cache_headers_private_without_last_modified():
+    headers = http_cache.cache_headers('W/"abc"', public=False)
+    assert "Last-Modified" not in headers
+    assert headers["Cache-Control"] == "private, no-cache"
+
+def test_cache_headers_naive_datetime_is_utc():
+    assert http_cache.cache_headers('W/"abc"', MODIFIED.replace(tzinfo=None))["Last-Modified"] == HTTP_DATE
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.models.user import UserRole
+from app.services import blog_service, export_service
+from app.utils.pagination import encode_cursor
+
+# Builds every statement the hot paths and check_query_plans.py use and compiles it
+# for Postgres, without a database: catches broken imports, bad options and
+# constructs the dialect can't render before a request hits them.
+
+CURSOR = encode_cursor(datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc), 42)
+USER = SimpleNamespace(id=7, role=UserRole.user)
+ADMIN = SimpleNamespace(id=1, role=UserRole.admin)
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.asyncpg.dialect()))
+
+BUILDERS = {
+    "list: first page": lambda: blog_service.blog_list_query(20),
+    "list: offset page": lambda: blog_service.blog_list_query(20, page=3),
+    "list: cursor": lambda: blog_service.blog_list_query(20, cursor=CURSOR),
+    "list: summary": lambda: blog_service.blog_list_query(20, fields=blog_service.SUMMARY_FIELDS),
+    "list: sparse": lambda: blog_service.blog_list_query(20, fields={"id", "title"}),
+    "list: tags all": lambda: blog_service.blog_list_query(20, tags=["a", "b"]),
+    "list: tags any": lambda: blog_service.blog_list_query(20, tags=["a", "b"], tag_match="any"),
+    "list: search": lambda: blog_service.blog_list_query(20, search="postgres tuning"),
+    "list: user": lambda: blog_service.blog_list_query(20, current_user=USER),
+    "list: admin": lambda: blog_service.blog_list_query(20, current_user=ADMIN),
+    "count": lambda: blog_service.blog_count_query(tags=["a"], current_user=USER),
+    "detail": lambda: blog_service.blog_detail_query(1),
+    "comments: first page": lambda: blog_service.comment_page_query(1, 10),
+    "comments: cursor": lambda: blog_service.comment_page_query(1, 10, CURSOR),
+    "liked ids": lambda: blog_service.liked_blog_ids_query(7, [1, 2, 3]),
+    "like": lambda: blog_service.like_statement(1, 7, True),
+    "unlike": lambda: blog_service.like_statement(1, 7, False),
+    "publish due": lambda: blog_service.publish_due_statement(),
+    "export": lambda: export_service.blog_export_query(author="someone"),
+}
+
+
+@pytest.mark.parametrize("name", BUILDERS)
+def test_builder_compiles(name):
+    assert compile_sql(BUILDERS[name]()).strip()
+
+def test_comment_page_query_shape():
+    sql = compile_sql(blog_service.comment_page_query(1, 10))
+    assert "JOIN users" in sql # Authors come in the same query
+    assert "ORDER BY comments.created_at, comments.id" in sql
+    assert "(comments.created_at, comments.id) >" not in sql
+    cursor_sql = compile_sql(blog_service.comment_page_query(1, 10, CURSOR))
+    assert "(comments.created_at, comments.id) >" in cursor_sql
+
+def test_comment_page_query_fetches_one_extra_row():
+    statement = blog_service.comment_page_query(1, 10)
+    assert statement._limit == 11
+
+def test_malformed_cursors_raise_value_error():
+    with pytest.raises(ValueError):
+        blog_service.comment_page_query(1, 10, "not a cursor")
+    with pytest.raises(ValueError):
+        blog_service.blog_list_query(20, cursor="not a cursor")
+
+def test_logged_in_count_splits_visibility():
+    # published OR own would scan the whole table, see check_query_plans.py
+    sql = compile_sql(blog_service.blog_count_query(tags=["a"], current_user=USER))
+    assert " OR " not in sql
+    assert sql.count("blogs.tags @>") == 2
+    assert " OR " in compile_sql(blog_service.blog_list_query(20, current_user=USER))
@@ -0,0 +1,43 @@
+import asyncio
+from sqlalchemy.dialects import postgresql
+from app.services import blog_service
+from app.services.blog_service import HIGHLIGHT_START, HIGHLIGHT_STOP, highlight_snippet
+
+
+def test_snippet_is_escaped_around_marks():
+    raw = f"<script>alert(1)</script> {HIGHLIGHT_START}tuning{HIGHLIGHT_STOP} & \"more\""
+    assert highlight_snippet(raw) == (
+        "&lt;script&gt;alert(1)&lt;/script&gt; <mark>tuning</mark> &amp; &quot;more&quot;"
+    )
+
+def test_user_written_mark_tags_stay_text():
+    assert highlight_snippet("<mark>fake</mark>") == "&lt;mark&gt;fake&lt;/mark&gt;"
+    assert highlight_snippet(None) is None
+
+
+class Result:
+    def all(self):
+        return [("blog", 0.5, f"a {HIGHLIGHT_START}b{HIGHLIGHT_STOP} <i>")]
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return Result()
+
+    async def scalar(self, statement):
+        return 1
+
+def test_search_blogs_highlights_with_private_markers():
+    db = FakeSession()
+    rows, total = asyncio.run(blog_service.search_blogs(db, "b", limit=10))
+    assert rows == [("blog", 0.5, "a <mark>b</mark> &lt;i&gt;")] and total == 1
+
+    statement = db.statements[0]
+    sql = str(statement.compile(dialect=postgresql.asyncpg.dialect()))
+    assert "ts_headline(" in sql and "translate(" in sql
+    params = statement.compile(dialect=postgresql.asyncpg.dialect()).params
+    assert blog_service.SEARCH_HEADLINE_OPTIONS in params.values()
+    assert "<mark>" not in blog_service.SEARCH_HEADLINE_OPTIONS